@@ -0,0 +1,78 @@
+"""
+Micro-benchmarks of the numeric and boolean fields of wtforms_piccolo,
+compared with the WTForms fields they replace.
+
+    python benchmarks/bench_fields.py
+"""
+
+import json
+import os
+import sys
+import timeit
+
+from wtforms import Form
+from wtforms import fields as f
+
+# Import the package from this checkout, also when it isn't installed.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wtforms_piccolo import fields  # noqa: E402
+
+NUMBER = 100_000
+REPEAT = 5
+
+
+class BenchForm(Form):
+    wtforms_integer = f.IntegerField()
+    piccolo_integer = fields.IntegerField()
+    wtforms_float = f.FloatField()
+    wtforms_decimal = f.DecimalField(places=2)
+    piccolo_decimal = fields.DecimalField(places=2)
+    wtforms_boolean = f.BooleanField()
+    piccolo_boolean = fields.BooleanField()
+
+
+CASES = [
+    ("integer", "wtforms_integer", "piccolo_integer", ["12345"]),
+    ("numeric", "wtforms_float", "piccolo_decimal", ["12345.67"]),
+    ("decimal", "wtforms_decimal", "piccolo_decimal", ["12345.67"]),
+    ("boolean", "wtforms_boolean", "piccolo_boolean", ["false"]),
+]
+
+
+def run():
+    form = BenchForm()
+    results = []
+    for name, current, new, valuelist in CASES:
+        for label, field_name in (("current", current), ("new", new)):
+            field = form[field_name]
+            seconds = min(
+                timeit.repeat(
+                    lambda: field.process_formdata(valuelist),
+                    number=NUMBER,
+                    repeat=REPEAT,
+                )
+            )
+            results.append(
+                {
+                    "benchmark": f"process_formdata[{name}]",
+                    "variant": label,
+                    "field": type(field).__module__
+                    + "."
+                    + type(field).__name__,
+                    "ns_per_call": seconds / NUMBER * 1e9,
+                }
+            )
+    return results
+
+
+if __name__ == "__main__":
+    results = run()
+    if "--json" in sys.argv:
+        json.dump(results, sys.stdout, indent=2)
+    else:
+        for result in results:
+            print(
+                f"{result['benchmark']:<30} {result['variant']:<8} "
+                f"{result['ns_per_call']:8.1f} ns  {result['field']}"
+            )
@@ -0,0 +1,193 @@
+"""
+Benchmarks of form generation, binding, validation and ForeignKey choice
+loading. The results are written as JSON, so they can be compared between
+releases.
+
+    python benchmarks/bench_forms.py --output results.json
+    python benchmarks/bench_forms.py --quick  # skip the 100k rows workload
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import typing as t
+from importlib import metadata
+
+from piccolo.columns import Boolean, ForeignKey, Integer, Text, Varchar
+from piccolo.engine.sqlite import SQLiteEngine
+from piccolo.table import (
+    Table,
+    create_db_tables_sync,
+    create_table_class,
+    drop_db_tables_sync,
+)
+
+# Import the package from this checkout, also when it isn't installed.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wtforms_piccolo.orm import table_fields, table_form  # noqa: E402
+
+DB = SQLiteEngine(
+    path=os.path.join(tempfile.gettempdir(), "wtfp_bench.sqlite")
+)
+
+
+class Owner(Table, db=DB):
+    name = Varchar()
+
+
+class Task(Table, db=DB):
+    name = Varchar(required=True)
+    description = Text()
+    views = Integer(default=0)
+    completed = Boolean(default=False)
+    owner = ForeignKey(references=Owner)
+
+
+Wide = create_table_class(
+    "Wide",
+    class_kwargs={"db": DB},
+    class_members={
+        f"column_{i}": (Varchar, Integer, Boolean, Text)[i % 4]()
+        for i in range(200)
+    },
+)
+
+
+class FormData(dict):
+    def getlist(self, key):
+        return [self[key]]
+
+
+def measure(
+    func: t.Callable[[], t.Any], number: int, repeat: int = 5
+) -> t.Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return {
+        "min_us": min(timings) * 1e6,
+        "mean_us": statistics.mean(timings) * 1e6,
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def form_benchmarks() -> t.List[t.Dict[str, t.Any]]:
+    results = []
+
+    def add(name: str, func: t.Callable[[], t.Any], number: int):
+        results.append({"benchmark": name, **measure(func, number)})
+
+    for label, table in (("narrow", Task), ("wide", Wide)):
+        number = 200 if table is Task else 20
+        add(f"table_fields[{label}]", lambda: table_fields(table), number)
+        add(
+            f"table_form[{label}, uncached]",
+            lambda: table_form(table, cache=False),
+            number,
+        )
+        add(f"table_form[{label}, cached]", lambda: table_form(table), number)
+
+        form_class = table_form(table)
+        formdata = FormData(
+            {
+                name: "1"
+                for name in form_class()._fields
+                if name not in ("id", "owner")
+            }
+        )
+        instance = table(**{name: "1" for name in formdata})
+        add(f"form[{label}, empty]", lambda: form_class(), number)
+        add(
+            f"form[{label}, formdata]",
+            lambda: form_class(formdata=formdata),
+            number,
+        )
+        add(f"form[{label}, obj]", lambda: form_class(obj=instance), number)
+
+        form = form_class(formdata=formdata)
+        add(f"validate[{label}]", form.validate, number)
+        add(
+            f"populate_obj[{label}]",
+            lambda: form.populate_obj(table()),
+            number,
+        )
+    return results
+
+
+def choices_benchmarks(sizes: t.List[int]) -> t.List[t.Dict[str, t.Any]]:
+    results = []
+    drop_db_tables_sync(Task, Owner)
+    create_db_tables_sync(Owner, Task)
+    loop = asyncio.new_event_loop()
+    try:
+        count = 0
+        for size in sizes:
+            for start in range(count, size, 1000):
+                Owner.insert(
+                    *[
+                        Owner(name=f"Owner {i}")
+                        for i in range(start, min(start + 1000, size))
+                    ]
+                ).run_sync()
+            count = size
+            form = table_form(Task)()
+            for limit in (100, None):
+                form.owner.limit = limit
+                results.append(
+                    {
+                        "benchmark": f"load_choices[{size} rows, "
+                        f"limit={limit}]",
+                        **measure(
+                            lambda: loop.run_until_complete(
+                                form.owner.load_choices()
+                            ),
+                            number=5 if size > 1000 else 50,
+                            repeat=3,
+                        ),
+                    }
+                )
+    finally:
+        loop.close()
+        drop_db_tables_sync(Task, Owner)
+    return results
+
+
+def run(quick: bool = False) -> t.Dict[str, t.Any]:
+    sizes = [10, 1000] if quick else [10, 1000, 100_000]
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            **{
+                package: metadata.version(package)
+                for package in ("piccolo", "wtforms")
+            },
+        },
+        "results": form_benchmarks() + choices_benchmarks(sizes),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", help="write the JSON results to a file")
+    parser.add_argument(
+        "--quick", action="store_true", help="skip the 100k rows workload"
+    )
+    args = parser.parse_args()
+
+    report = run(quick=args.quick)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
@@ -1,19 +1,51 @@
+import os
+import secrets
+
 from home.piccolo_app import APP_CONFIG
 from home.tables import Task
-from piccolo.apps.user.tables import BaseUser
 from piccolo.engine import engine_finder
 from piccolo_admin.endpoints import create_admin
 from piccolo_api.crud.endpoints import PiccoloCRUD
 from starlette.applications import Starlette
-from starlette.responses import RedirectResponse
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse, RedirectResponse, Response
 from starlette.routing import Mount
 from starlette.templating import Jinja2Templates
 from utils import pagination
 
-from wtforms_piccolo.orm import table_form
+from wtforms_piccolo.fields import (
+    foreign_key_readables,
+    load_foreign_key_choices,
+)
+from wtforms_piccolo.forms import AsyncTableForm
+from wtforms_piccolo.registry import FormRegistry
+from wtforms_piccolo.rendering import FormRenderer
+from wtforms_piccolo.schema import form_schema
 
 templates = Jinja2Templates(directory="home/templates")
-
+# renders the forms from HTML fragments pre-rendered once per form class
+renderer = FormRenderer(
+    row_template=(
+        '<div class="form-group">{label}:\n{widget}\n{errors}</div>\n'
+    ),
+    error_template='<span style="color: red;">*{error}</span>',
+    widget_kw={"class": "form-control"},
+)
+templates.env.globals["render_form"] = renderer.render
+
+# form classes built on import, so with gunicorn ``preload_app`` they are
+# built once in the master process and shared by the forked workers (see
+# gunicorn.conf.py)
+forms = FormRegistry()
+for table in APP_CONFIG.table_classes:
+    forms.register(table, base_class=AsyncTableForm, exclude=["id"])
+forms.preload(renderers=[renderer])
+
+# signs the pagination cursors in the URLs
+paginator = pagination.KeysetPagination(
+    column=Task.id,
+    secret=os.environ.get("PAGINATION_SECRET") or secrets.token_hex(16),
+)
 
 app = Starlette(
     routes=[
@@ -32,26 +64,19 @@ app = Starlette(
 
 @app.route("/", methods=["GET"])
 async def home(request):
-    page_query = pagination.get_page_number(url=request.url)
-    count = await Task.count().run()
-    paginator = pagination.Pagination(page_query, count)
-    tasks = (
-        await Task.select(Task.all_columns(), Task.get_readable())
-        .limit(paginator.page_size)
-        .offset(paginator.offset())
-        .order_by(Task.id, ascending=False)
-        .run()
+    # keyset pagination, the cost of a page doesn't grow with its depth
+    # the FK labels are joined in the same query, named "<column>_readable"
+    page = await paginator.paginate(
+        Task.select(Task.all_columns(), *foreign_key_readables(Task)),
+        url=request.url,
     )
+    tasks = page.rows
 
     field_name_list = [i._meta.name for i in Task._meta.columns]
     fk_fields = [i._meta.name for i in Task._meta.foreign_key_columns]
 
     # pagination links in templates
-    page_controls = pagination.get_page_controls(
-        url=request.url,
-        current_page=paginator.current_page(),
-        total_pages=paginator.total_pages(),
-    )
+    page_controls = pagination.get_keyset_controls(page)
     return templates.TemplateResponse(
         "home.html",
         {
@@ -61,23 +86,21 @@ async def home(request):
             "field_name_list": field_name_list,
             "fk_fields": fk_fields,
             "page_controls": page_controls,
+            "approximate_count": await pagination.approximate_count(Task),
         },
     )
 
 
 @app.route("/create/", methods=["GET", "POST"])
 async def create(request):
-    TaskForm = table_form(Task, exclude=["id"])
-    users = await BaseUser.select().run()
+    TaskForm = forms.get(Task)
     data = await request.form()
     form = TaskForm(formdata=data)
-    instance = Task()
-    # FK select field
-    form.task_user.choices = [(i["id"], i["username"]) for i in users]
-    if request.method == "POST" and form.validate():
-        form.populate_obj(instance)
-        await instance.save()
+    if request.method == "POST" and await form.validate_async():
+        await form.save()
         return RedirectResponse(url="/", status_code=302)
+    # FK select field choices are only needed for rendering
+    await load_foreign_key_choices(form)
     return templates.TemplateResponse(
         "create.html",
         {
@@ -91,17 +114,17 @@ async def create(request):
 @app.route("/{id:int}/edit/", methods=["GET", "POST"])
 async def edit(request):
     path_id = request.path_params["id"]
-    item = await Task.objects().get(Task.id == path_id).run()
-    users = await BaseUser.select().run()
     data = await request.form()
-    TaskForm = table_form(Task, exclude=["id"])
-    form = TaskForm(obj=item, formdata=data)
-    # FK select field
-    form.task_user.choices = [(i["id"], i["username"]) for i in users]
-    if request.method == "POST" and form.validate():
-        form.populate_obj(item)
-        await item.save().run()
+    TaskForm = forms.get(Task)
+    # selects only the form columns, and the FK labels in the same query
+    form = await TaskForm.load(path_id, formdata=data)
+    if form is None:
+        raise HTTPException(status_code=404)
+    if request.method == "POST" and await form.validate_async():
+        await form.save(form.obj)
         return RedirectResponse(url="/", status_code=302)
+    # FK select field choices are only needed for rendering
+    await load_foreign_key_choices(form)
     return templates.TemplateResponse(
         "edit.html",
         {
@@ -136,3 +159,26 @@ async def close_database_connection_pool():
         await engine.close_connection_pool()
     except Exception:
         print("Unable to connect to the database")
+
+
+@app.route("/users/", methods=["GET"])
+async def user_choices(request):
+    # autocomplete endpoint for the FK select field
+    TaskForm = forms.get(Task)
+    choices = await TaskForm().task_user.fetch_choices(
+        search=request.query_params.get("q"), limit=20
+    )
+    return JSONResponse([{"id": i, "text": label} for i, label in choices])
+
+
+@app.route("/schema/", methods=["GET"])
+async def task_schema(request):
+    # validation rules of the task form, for client side validation
+    TaskForm = forms.get(Task)
+    exported = form_schema(TaskForm, choices_url="/users/")
+    headers = {"ETag": exported.etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == exported.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(
+        exported.json, media_type="application/json", headers=headers
+    )
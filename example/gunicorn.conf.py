@@ -0,0 +1,13 @@
+# Loads app.py in the master process, before the workers are forked.
+preload_app = True
+workers = 4
+worker_class = "uvicorn.workers.UvicornWorker"
+
+
+def when_ready(server):
+    # The app is loaded, and the workers not forked yet: move the objects
+    # created so far (the form classes among them) out of the reach of the
+    # garbage collector, so it doesn't write to their shared memory pages.
+    import app
+
+    app.forms.preload(renderers=[app.renderer], freeze_gc=True)
@@ -1,10 +1,17 @@
 # pagination from encode hostedapi
 # https://github.com/encode/hostedapi/blob/master/source/pagination.py
 
+import base64
+import hashlib
+import hmac
+import json
 import typing
 from dataclasses import dataclass
 from math import ceil
 
+from piccolo.columns import Column
+from piccolo.query import Select
+from piccolo.table import Table
 from starlette.datastructures import URL, QueryParams
 
 
@@ -167,3 +174,161 @@ class Pagination:
 
     def offset(self) -> int:
         return (self.current_page() - 1) * self.page_size
+
+
+# keyset (cursor) pagination, the rows of a page are found with an index
+# range scan (``id < last seen id``) instead of counting and skipping rows
+
+
+def sign_cursor(direction: str, value: typing.Any, secret: str) -> str:
+    """
+    Returns an opaque cursor token for the key ``value``, signed so it can't
+    be tampered with in the URL.
+    """
+    payload = base64.urlsafe_b64encode(
+        json.dumps([direction, value]).encode()
+    ).rstrip(b"=")
+    signature = hmac.new(secret.encode(), payload, hashlib.sha256)
+    return f"{payload.decode()}.{signature.hexdigest()[:16]}"
+
+
+def unsign_cursor(
+    token: str, secret: str
+) -> typing.Optional[typing.Tuple[str, typing.Any]]:
+    """
+    Returns the ``(direction, value)`` of a cursor token, or None if the
+    token is invalid.
+    """
+    payload, _, signature = token.partition(".")
+    expected = hmac.new(secret.encode(), payload.encode(), hashlib.sha256)
+    if not hmac.compare_digest(signature, expected.hexdigest()[:16]):
+        return None
+    try:
+        direction, value = json.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+    except ValueError:
+        return None
+    if direction not in ("next", "previous"):
+        return None
+    return direction, value
+
+
+@dataclass
+class KeysetPage:
+    rows: typing.List[dict]
+    next_url: typing.Optional[URL] = None
+    previous_url: typing.Optional[URL] = None
+
+
+@dataclass
+class KeysetPagination:
+    """
+    Pages through the rows of a query by a unique column (the primary key),
+    newest first.
+    """
+
+    column: Column
+    secret: str
+    page_size: int = 6  # change to set different result per page
+    query_param: str = "cursor"
+
+    def get_cursor(
+        self, url: URL
+    ) -> typing.Optional[typing.Tuple[str, typing.Any]]:
+        token = QueryParams(url.query).get(self.query_param)
+        return unsign_cursor(token, self.secret) if token else None
+
+    async def paginate(self, query: Select, url: URL) -> KeysetPage:
+        """
+        Runs the query for the page of the cursor in the URL, and returns
+        the rows with the previous / next page URLs.
+        """
+        key = self.column._meta.name
+        direction, value = self.get_cursor(url) or ("next", None)
+        if direction == "next":
+            if value is not None:
+                query = query.where(self.column < value)
+            query = query.order_by(self.column, ascending=False)
+        else:
+            query = query.where(self.column > value).order_by(
+                self.column, ascending=True
+            )
+        # one extra row tells if there is a page after this one
+        rows = await query.limit(self.page_size + 1).run()
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if direction == "previous":
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, value is not None
+
+        page = KeysetPage(rows=rows)
+        if not rows:
+            if value is not None:
+                page.previous_url = url.remove_query_params(self.query_param)
+            return page
+        if has_next:
+            page.next_url = url.include_query_params(
+                **{
+                    self.query_param: sign_cursor(
+                        "next", rows[-1][key], self.secret
+                    )
+                }
+            )
+        if has_previous:
+            page.previous_url = url.include_query_params(
+                **{
+                    self.query_param: sign_cursor(
+                        "previous", rows[0][key], self.secret
+                    )
+                }
+            )
+        return page
+
+
+def get_keyset_controls(page: KeysetPage) -> typing.List[PageControl]:
+    """
+    Returns Previous / Next pagination controls, which don't need a total
+    count.
+
+    Previous Next
+    """
+    if page.previous_url is None and page.next_url is None:
+        return []
+    return [
+        PageControl(
+            text="Previous",
+            url=page.previous_url,
+            is_disabled=page.previous_url is None,
+        ),
+        PageControl(
+            text="Next", url=page.next_url, is_disabled=page.next_url is None
+        ),
+    ]
+
+
+async def approximate_count(table: typing.Type[Table]) -> int:
+    """
+    Returns an estimate of the number of rows, without counting them: the
+    planner statistics on Postgres, and the largest rowid on SQLite (an
+    overestimate after deletes). Other databases are counted exactly.
+    """
+    engine_type = table._meta.db.engine_type
+    tablename = table._meta.tablename
+    if engine_type == "postgres":
+        rows = await table.raw(
+            "SELECT reltuples::bigint AS estimate FROM pg_class "
+            "WHERE oid = to_regclass({})",
+            tablename,
+        ).run()
+        # -1 if the table was never vacuumed or analyzed
+        if rows and rows[0]["estimate"] >= 0:
+            return rows[0]["estimate"]
+    elif engine_type == "sqlite":
+        rows = await table.raw(
+            f'SELECT max(rowid) AS estimate FROM "{tablename}"'
+        ).run()
+        return rows[0]["estimate"] or 0
+    return await table.count().run()
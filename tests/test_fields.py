@@ -0,0 +1,311 @@
+import asyncio
+import os
+import tempfile
+from unittest import TestCase, mock
+
+from piccolo.columns import ForeignKey, Varchar
+from piccolo.columns.readable import Readable
+from piccolo.engine.sqlite import SQLiteEngine
+from piccolo.table import Table, create_db_tables_sync, drop_db_tables_sync
+
+from wtforms_piccolo.fields import (
+    ChoicesCache,
+    ForeignKeyField,
+    foreign_key_readables,
+    load_foreign_key_choices,
+    validate_foreign_keys,
+)
+from wtforms_piccolo.forms import AsyncTableForm
+from wtforms_piccolo.orm import table_form
+
+DB = SQLiteEngine(path=os.path.join(tempfile.gettempdir(), "wtfp.sqlite"))
+
+
+class Genre(Table, db=DB):
+    name = Varchar()
+
+    @classmethod
+    def get_readable(cls):
+        return Readable(template="%s", columns=[cls.name])
+
+
+class Publisher(Table, db=DB):
+    name = Varchar()
+
+
+class Album(Table, db=DB):
+    title = Varchar()
+    genre = ForeignKey(references=Genre)
+    publisher = ForeignKey(references=Publisher)
+
+
+class Single(Table, db=DB):
+    title = Varchar()
+    genre = ForeignKey(references=Genre)
+
+    @classmethod
+    def get_readable(cls):
+        # Goes through the ForeignKey to Genre.
+        return Readable(
+            template="%s (%s)", columns=[cls.title, cls.genre.name]
+        )
+
+
+class Play(Table, db=DB):
+    single = ForeignKey(references=Single)
+
+
+TABLES = [Genre, Publisher, Album, Single, Play]
+
+
+class DBTestCase(TestCase):
+    def setUp(self):
+        create_db_tables_sync(*TABLES, if_not_exists=True)
+        Genre.insert(
+            *[Genre(name=f"Genre {i}") for i in range(1, 21)],
+            Genre(name="Jazz"),
+        ).run_sync()
+        Publisher.insert(Publisher(name="Label")).run_sync()
+
+    def tearDown(self):
+        drop_db_tables_sync(*TABLES)
+
+
+class ForeignKeyFieldTestCase(DBTestCase):
+    def test_field_type(self):
+        form = table_form(Album)()
+        self.assertIsInstance(form.genre, ForeignKeyField)
+        self.assertIs(form.genre.references, Genre)
+        self.assertIsNone(form.genre.choices)
+
+    def test_load_choices_limit(self):
+        form = table_form(Album)()
+        form.genre.limit = 5
+        asyncio.run(form.genre.load_choices())
+        self.assertEqual(
+            form.genre.choices, [(i, f"Genre {i}") for i in range(1, 6)]
+        )
+
+    def test_load_choices_includes_selected(self):
+        form = table_form(Album)(genre=21)
+        asyncio.run(form.genre.load_choices(limit=2))
+        self.assertEqual([i[0] for i in form.genre.choices], [21, 1, 2])
+
+    def test_search(self):
+        form = table_form(Album)()
+        choices = asyncio.run(form.genre.fetch_choices(search="jazz"))
+        self.assertEqual(choices, [(21, "Jazz")])
+        # the default readable is the primary key, so search is ignored
+        choices = asyncio.run(form.publisher.fetch_choices(search="x"))
+        self.assertEqual(choices, [(1, "1")])
+
+    def test_load_foreign_key_choices(self):
+        form = table_form(Album)()
+        asyncio.run(load_foreign_key_choices(form, limit=3))
+        self.assertEqual(len(form.genre.choices), 3)
+        self.assertEqual(form.publisher.choices, [(1, "1")])
+
+    def test_validate_without_choices(self):
+        form = table_form(Album, only=["genre"])(genre=1)
+        self.assertTrue(form.validate())
+
+
+class ReadableTestCase(DBTestCase):
+    def setUp(self):
+        super().setUp()
+        Album.insert(Album(title="Album", genre=21, publisher=1)).run_sync()
+        self.queries = []
+
+    def count_queries(self):
+        run_querystring = SQLiteEngine.run_querystring
+
+        async def counting(engine, querystring, *args, **kwargs):
+            self.queries.append(querystring)
+            return await run_querystring(engine, querystring, *args, **kwargs)
+
+        return mock.patch.object(SQLiteEngine, "run_querystring", counting)
+
+    def test_field_readable(self):
+        form = table_form(Album)()
+        self.assertEqual(form.genre.readable.output_name, "genre_readable")
+        self.assertEqual(
+            form.genre.readable.columns[0]._meta.call_chain[0]._meta.name,
+            "genre",
+        )
+
+    def test_nested_readable(self):
+        Single.insert(Single(title="Hit", genre=21)).run_sync()
+        Play.insert(Play(single=1)).run_sync()
+        PlayForm = table_form(Play, base_class=AsyncTableForm)
+        form = asyncio.run(PlayForm.load(1))
+        self.assertEqual(form.single.selected, (1, "Hit (Jazz)"))
+        rows = Play.select(*foreign_key_readables(Play)).run_sync()
+        self.assertEqual(rows, [{"single_readable": "Hit (Jazz)"}])
+
+    def test_foreign_key_readables(self):
+        with self.count_queries():
+            rows = asyncio.run(
+                Album.select(Album.title, *foreign_key_readables(Album)).run()
+            )
+        self.assertEqual(len(self.queries), 1)
+        self.assertEqual(
+            rows,
+            [
+                {
+                    "title": "Album",
+                    "genre_readable": "Jazz",
+                    "publisher_readable": "1",
+                }
+            ],
+        )
+
+    def test_load_and_render_in_one_query(self):
+        AlbumForm = table_form(Album, base_class=AsyncTableForm)
+        with self.count_queries():
+            form = asyncio.run(AlbumForm.load(1))
+            html = form.genre() + form.publisher()
+        self.assertEqual(len(self.queries), 1)
+        self.assertIn('<option selected value="21">Jazz</option>', html)
+        self.assertIn('<option selected value="1">1</option>', html)
+
+        # the selected rows aren't queried again with the choices
+        with self.count_queries():
+            asyncio.run(load_foreign_key_choices(form, limit=0))
+        self.assertEqual(len(self.queries), 3)
+        self.assertEqual(form.genre.choices, [(21, "Jazz")])
+
+        # another selected row isn't rendered with the loaded label
+        form.genre.choices = None
+        form.genre.data = 1
+        self.assertNotIn("Jazz", form.genre())
+
+
+class ValidateForeignKeysTestCase(DBTestCase):
+    def test_validate_exists(self):
+        form = table_form(Album)(genre=1)
+        self.assertTrue(asyncio.run(form.genre.validate_exists()))
+        form = table_form(Album)(genre=100)
+        self.assertFalse(asyncio.run(form.genre.validate_exists()))
+        self.assertEqual(form.genre.errors, ["Not a valid choice."])
+
+    def test_validate_foreign_keys(self):
+        form = table_form(Album)(genre=2, publisher=1)
+        self.assertTrue(form.validate())
+        self.assertTrue(asyncio.run(validate_foreign_keys(form)))
+
+        form = table_form(Album)(genre=2, publisher=5)
+        self.assertTrue(form.validate())
+        self.assertFalse(asyncio.run(validate_foreign_keys(form)))
+        self.assertEqual(list(form.errors), ["publisher"])
+
+    def test_validate_same_table(self):
+        class Compilation(Table, db=DB):
+            genre = ForeignKey(references=Genre)
+            sub_genre = ForeignKey(references=Genre)
+
+        form = table_form(Compilation)(genre=3, sub_genre=30)
+        self.assertFalse(asyncio.run(validate_foreign_keys(form)))
+        self.assertEqual(list(form.errors), ["sub_genre"])
+
+
+class ChoicesCacheTestCase(DBTestCase):
+    def test_cached_choices(self):
+        cache = ChoicesCache(ttl=60)
+        AlbumForm = table_form(
+            Album,
+            only=["publisher"],
+            field_args={"publisher": {"cache": cache}},
+        )
+        form = AlbumForm()
+        asyncio.run(form.publisher.load_choices())
+        Publisher.insert(Publisher(name="Other")).run_sync()
+
+        form = AlbumForm()
+        asyncio.run(form.publisher.load_choices())
+        self.assertEqual(form.publisher.choices, [(1, "1")])
+
+        cache.invalidate(Publisher)
+        asyncio.run(form.publisher.load_choices())
+        self.assertEqual(form.publisher.choices, [(1, "1"), (2, "2")])
+
+    def test_ttl(self):
+        cache = ChoicesCache(ttl=0)
+        form = table_form(
+            Album,
+            only=["publisher"],
+            field_args={"publisher": {"cache": cache}},
+        )()
+        asyncio.run(form.publisher.load_choices())
+        Publisher.insert(Publisher(name="Other")).run_sync()
+        asyncio.run(form.publisher.load_choices())
+        self.assertEqual(len(form.publisher.choices), 2)
+
+    def test_single_flight(self):
+        cache = ChoicesCache(maxsize=1)
+        calls = []
+
+        async def load():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return [(1, "One")]
+
+        async def run():
+            return await asyncio.gather(
+                cache.get("a", load), cache.get("a", load)
+            )
+
+        self.assertEqual(asyncio.run(run()), [[(1, "One")], [(1, "One")]])
+        self.assertEqual(len(calls), 1)
+
+    def test_failed_load(self):
+        cache = ChoicesCache()
+
+        async def load():
+            raise ValueError()
+
+        with self.assertRaises(ValueError):
+            asyncio.run(cache.get("a", load))
+        self.assertEqual(cache._pending, {})
+
+    def test_invalidate_during_load(self):
+        cache = ChoicesCache()
+        labels = ["Old"]
+        started = []
+
+        async def load():
+            label = labels[0]
+            started.append(1)
+            await asyncio.sleep(0.01)
+            return [(1, label)]
+
+        async def run():
+            pending = asyncio.ensure_future(cache.get((Publisher,), load))
+            while not started:
+                await asyncio.sleep(0)
+            # A write, after the pending load read the table.
+            labels[0] = "New"
+            cache.invalidate(Publisher)
+            self.assertEqual(await pending, [(1, "Old")])
+            return await cache.get((Publisher,), load)
+
+        self.assertEqual(asyncio.run(run()), [(1, "New")])
+        self.assertEqual(cache._pending, {})
+
+    def test_cancelled_caller(self):
+        cache = ChoicesCache()
+
+        async def load():
+            await asyncio.sleep(0.01)
+            return [(1, "One")]
+
+        async def run():
+            first = asyncio.ensure_future(cache.get("a", load))
+            second = asyncio.ensure_future(cache.get("a", load))
+            await asyncio.sleep(0)
+            # e.g. the client of the first request disconnected
+            first.cancel()
+            return await second, first.cancelled()
+
+        self.assertEqual(asyncio.run(run()), ([(1, "One")], True))
+        self.assertEqual(cache._pending, {})
+        self.assertIn("a", cache._data)
@@ -0,0 +1,549 @@
+import asyncio
+import os
+import tempfile
+from enum import Enum
+from unittest import TestCase
+
+from piccolo.columns import JSON, ForeignKey, Integer, Varchar
+from piccolo.engine.sqlite import SQLiteEngine
+from piccolo.table import Table, create_db_tables_sync, drop_db_tables_sync
+from wtforms import fields as f
+from wtforms.validators import StopValidation, ValidationError
+
+from wtforms_piccolo.fields import EnumSelectField
+from wtforms_piccolo.forms import (
+    AsyncTableForm,
+    FormPool,
+    VersionedTableForm,
+)
+from wtforms_piccolo.orm import table_form, table_formset
+
+
+class Rating(Enum):
+    good = 1
+    bad = 2
+
+
+DB = SQLiteEngine(
+    path=os.path.join(tempfile.gettempdir(), "wtfp_forms.sqlite")
+)
+
+
+class Director(Table, db=DB):
+    name = Varchar()
+
+
+class Movie(Table, db=DB):
+    title = Varchar(required=True)
+    year = Integer()
+    director = ForeignKey(references=Director)
+
+
+class Actor(Table, db=DB):
+    name = Varchar(unique=True)
+    director = ForeignKey(references=Director)
+
+
+class Article(Table, db=DB):
+    title = Varchar()
+    version = Integer(default=1)
+
+
+class Note(Table, db=DB):
+    title = Varchar()
+    data = JSON()
+
+
+TABLES = [Director, Movie, Actor, Article, Note]
+
+
+class DummyPostData(dict):
+    def getlist(self, key):
+        value = self[key]
+        return value if isinstance(value, list) else [value]
+
+
+class DBTestCase(TestCase):
+    def setUp(self):
+        create_db_tables_sync(*TABLES, if_not_exists=True)
+        Director.insert(Director(name="Director")).run_sync()
+
+    def tearDown(self):
+        drop_db_tables_sync(*TABLES)
+
+
+async def not_banned(form, field):
+    await asyncio.sleep(0)
+    if field.data == "Banned":
+        raise ValidationError("Banned title.")
+
+
+class AsyncTableFormTestCase(DBTestCase):
+    def test_async_validators(self):
+        MovieForm = table_form(
+            Movie,
+            base_class=AsyncTableForm,
+            field_args={"title": {"validators": [not_banned]}},
+        )
+        form = MovieForm(title="Banned", year=2000, director=1)
+        self.assertTrue(form.validate())
+        self.assertFalse(asyncio.run(form.validate_async()))
+        self.assertEqual(form.errors, {"title": ["Banned title."]})
+
+        form = MovieForm(title="Title", year=2000, director=1)
+        self.assertTrue(asyncio.run(form.validate_async()))
+
+    def test_inline_and_extra_validators(self):
+        calls = []
+
+        class MovieForm(table_form(Movie, base_class=AsyncTableForm)):
+            async def validate_year(self, field):
+                calls.append("year")
+                raise StopValidation("Wrong year.")
+
+        async def extra(form, field):
+            calls.append("title")
+
+        form = MovieForm(title="Title", year=1, director=1)
+        result = asyncio.run(form.validate_async({"title": [extra]}))
+        self.assertFalse(result)
+        self.assertEqual(sorted(calls), ["title", "year"])
+        self.assertEqual(form.errors, {"year": ["Wrong year."]})
+
+    def test_skip_invalid_fields(self):
+        MovieForm = table_form(
+            Movie,
+            base_class=AsyncTableForm,
+            field_args={"title": {"validators": [not_banned]}},
+        )
+        form = MovieForm(title="", director=100)
+        self.assertFalse(asyncio.run(form.validate_async()))
+        self.assertEqual(
+            form.errors,
+            {
+                "title": ["This field is required."],
+                "director": ["Not a valid choice."],
+            },
+        )
+
+    def test_save(self):
+        MovieForm = table_form(
+            Movie, base_class=AsyncTableForm, exclude=["id"]
+        )
+        form = MovieForm(title="Title", year=2000, director=1)
+        movie = asyncio.run(form.save())
+        self.assertEqual(
+            Movie.select(Movie.title, Movie.director).first().run_sync(),
+            {"title": "Title", "director": 1},
+        )
+
+        form = MovieForm(title="New title", year=2000, director=1)
+        asyncio.run(form.save(movie))
+        self.assertEqual(Movie.count().run_sync(), 1)
+        self.assertEqual(
+            Movie.select(Movie.title).first().run_sync(),
+            {"title": "New title"},
+        )
+
+
+class ChangedFieldsTestCase(DBTestCase):
+    def setUp(self):
+        super().setUp()
+        Movie.insert(Movie(title="Title", year=2000, director=1)).run_sync()
+        self.movie = Movie.objects().first().run_sync()
+        self.MovieForm = table_form(
+            Movie, base_class=AsyncTableForm, exclude=["id"]
+        )
+
+    def test_changed_fields(self):
+        form = self.MovieForm(obj=self.movie)
+        self.assertEqual(form.changed_fields(), [])
+        form.year.data = 2001
+        self.assertEqual(form.changed_fields(), ["year"])
+        self.assertEqual(
+            self.MovieForm().changed_fields(), ["title", "year", "director"]
+        )
+
+    def test_save_changed_columns(self):
+        form = self.MovieForm(obj=self.movie)
+        form.year.data = 2001
+        # a concurrent change of another column isn't overwritten
+        Movie.update({Movie.title: "Other"}, force=True).run_sync()
+        asyncio.run(form.save(self.movie))
+        self.assertEqual(
+            Movie.select(Movie.title, Movie.year).first().run_sync(),
+            {"title": "Other", "year": 2001},
+        )
+
+    def test_save_unchanged(self):
+        form = self.MovieForm(obj=self.movie)
+        Movie.update({Movie.title: "Other"}, force=True).run_sync()
+        asyncio.run(form.save(self.movie))
+        self.assertEqual(
+            Movie.select(Movie.title).first().run_sync(), {"title": "Other"}
+        )
+
+
+class LoadTestCase(DBTestCase):
+    def setUp(self):
+        super().setUp()
+        Movie.insert(Movie(title="Title", year=2000, director=1)).run_sync()
+        self.pk = Movie.select(Movie.id).first().run_sync()["id"]
+
+    def test_load_columns(self):
+        MovieForm = table_form(
+            Movie, base_class=AsyncTableForm, only=["title", "director"]
+        )
+        self.assertEqual(
+            [i._meta.name for i in MovieForm.get_load_columns()],
+            ["id", "title", "director"],
+        )
+
+    def test_load(self):
+        MovieForm = table_form(
+            Movie, base_class=AsyncTableForm, only=["title", "director"]
+        )
+        form = asyncio.run(MovieForm.load(self.pk))
+        self.assertEqual(form.title.data, "Title")
+        self.assertEqual(form.obj.id, self.pk)
+        self.assertTrue(form.obj._exists_in_db)
+        # the year column isn't loaded, it has its default value
+        self.assertEqual(form.obj.year, 0)
+
+        readable = Director.select(Director.get_readable()).first().run_sync()
+        self.assertEqual(form.director.selected, (1, readable["readable"]))
+        asyncio.run(form.director.load_choices(limit=0))
+        self.assertEqual(form.director.choices, [form.director.selected])
+
+        form = asyncio.run(
+            MovieForm.load(self.pk, formdata=DummyPostData(title="New"))
+        )
+        asyncio.run(form.save(form.obj))
+        self.assertEqual(
+            Movie.select(Movie.title, Movie.year).first().run_sync(),
+            {"title": "New", "year": 2000},
+        )
+
+    def test_load_missing(self):
+        MovieForm = table_form(Movie, base_class=AsyncTableForm)
+        self.assertIsNone(asyncio.run(MovieForm.load(self.pk + 1)))
+
+    def test_load_versioned(self):
+        MovieForm = table_form(
+            Movie, base_class=VersionedTableForm, only=["title"]
+        )
+        movie = Movie.objects().first().run_sync()
+        form = asyncio.run(MovieForm.load(self.pk))
+        self.assertEqual(
+            form.version_token.data, MovieForm(obj=movie).version_token.data
+        )
+
+
+class VersionedTableFormTestCase(DBTestCase):
+    def setUp(self):
+        super().setUp()
+        Movie.insert(Movie(title="Title", year=2000, director=1)).run_sync()
+        Article.insert(Article(title="Title")).run_sync()
+        self.MovieForm = table_form(
+            Movie, base_class=VersionedTableForm, exclude=["id"]
+        )
+
+        class ArticleForm(
+            table_form(
+                Article,
+                base_class=VersionedTableForm,
+                only=["title"],
+            )
+        ):
+            version_column = "version"
+
+        self.ArticleForm = ArticleForm
+
+    def post(self, form_class, obj, **data):
+        token = form_class(obj=obj).version_token.data
+        return DummyPostData(version_token=token, **data)
+
+    def test_save(self):
+        movie = Movie.objects().first().run_sync()
+        formdata = self.post(
+            self.MovieForm, movie, title="New", year="2001", director="1"
+        )
+        form = self.MovieForm(formdata=formdata, obj=movie)
+        self.assertTrue(asyncio.run(form.validate_async()))
+        self.assertIs(asyncio.run(form.save(movie)), movie)
+        self.assertEqual(
+            Movie.select(Movie.title, Movie.year).first().run_sync(),
+            {"title": "New", "year": 2001},
+        )
+
+    def test_stale_token(self):
+        movie = Movie.objects().first().run_sync()
+        formdata = self.post(
+            self.MovieForm, movie, title="New", year="2001", director="1"
+        )
+        Movie.update({Movie.year: 1999}, force=True).run_sync()
+        movie = Movie.objects().first().run_sync()
+        form = self.MovieForm(formdata=formdata, obj=movie)
+        self.assertFalse(asyncio.run(form.validate_async()))
+        self.assertEqual(form.form_errors, [form.conflict_message])
+
+    def test_missing_token(self):
+        movie = Movie.objects().first().run_sync()
+        formdata = DummyPostData(title="New", year="2001", director="1")
+        form = self.MovieForm(formdata=formdata, obj=movie)
+        self.assertFalse(form.version_token.data)
+        self.assertFalse(asyncio.run(form.validate_async()))
+        self.assertFalse(form.validate())
+        self.assertEqual(form.form_errors, [form.conflict_message])
+
+    def test_concurrent_save(self):
+        movie = Movie.objects().first().run_sync()
+        formdata = self.post(
+            self.MovieForm, movie, title="New", year="2000", director="1"
+        )
+        form = self.MovieForm(formdata=formdata, obj=movie)
+        self.assertTrue(asyncio.run(form.validate_async()))
+        Movie.update({Movie.year: 1999}, force=True).run_sync()
+        self.assertIsNone(asyncio.run(form.save(movie)))
+        self.assertEqual(form.form_errors, [form.conflict_message])
+        self.assertEqual(
+            Movie.select(Movie.title).first().run_sync(), {"title": "Title"}
+        )
+
+    def test_json_column(self):
+        # Postgres can't compare json values, so they're left out of the
+        # conditional update.
+        Note.insert(Note(title="Title", data='{"a": 1}')).run_sync()
+        NoteForm = table_form(
+            Note, base_class=VersionedTableForm, exclude=["id"]
+        )
+        note = Note.objects().first().run_sync()
+        formdata = self.post(NoteForm, note, title="New", data='{"a": 1}')
+        form = NoteForm(formdata=formdata, obj=note)
+        self.assertTrue(asyncio.run(form.validate_async()))
+        Note.update({Note.data: '{"a": 2}'}, force=True).run_sync()
+        self.assertIs(asyncio.run(form.save(note)), note)
+        self.assertEqual(
+            Note.select(Note.title).first().run_sync(), {"title": "New"}
+        )
+
+    def test_version_column(self):
+        article = Article.objects().first().run_sync()
+        form = self.ArticleForm(obj=article)
+        self.assertEqual(form.version_token.data, "1")
+
+        formdata = self.post(self.ArticleForm, article, title="New")
+        form = self.ArticleForm(formdata=formdata, obj=article)
+        self.assertTrue(asyncio.run(form.validate_async()))
+        asyncio.run(form.save(article))
+        self.assertEqual(article.version, 2)
+        self.assertEqual(
+            Article.select(Article.title, Article.version).first().run_sync(),
+            {"title": "New", "version": 2},
+        )
+
+        # a second save with the stale version doesn't match the row
+        stale = Article.objects().first().run_sync()
+        stale.version = 1
+        form = self.ArticleForm(
+            formdata=DummyPostData(version_token="1", title="Old"), obj=stale
+        )
+        self.assertTrue(asyncio.run(form.validate_async()))
+        self.assertIsNone(asyncio.run(form.save(stale)))
+
+
+class TableFormSetTestCase(DBTestCase):
+    def setUp(self):
+        super().setUp()
+        Actor.insert(
+            Actor(name="Ann", director=1), Actor(name="Bob", director=1)
+        ).run_sync()
+        self.ActorFormSet = table_formset(Actor, exclude=["id"])
+
+    def test_insert(self):
+        formset = self.ActorFormSet(
+            formdata=DummyPostData(
+                {
+                    "rows-0-name": "Cid",
+                    "rows-0-director": "1",
+                    "rows-1-name": "Dan",
+                    "rows-1-director": "1",
+                }
+            )
+        )
+        self.assertTrue(asyncio.run(formset.validate_async()))
+        instances = asyncio.run(formset.save())
+        self.assertEqual([i.name for i in instances], ["Cid", "Dan"])
+        self.assertEqual(Actor.count().run_sync(), 4)
+
+    def test_batched_errors(self):
+        formset = self.ActorFormSet(
+            formdata=DummyPostData(
+                {
+                    "rows-0-name": "Ann",
+                    "rows-0-director": "1",
+                    "rows-1-name": "Cid",
+                    "rows-1-director": "5",
+                    "rows-2-name": "Cid",
+                    "rows-2-director": "1",
+                }
+            )
+        )
+        self.assertFalse(asyncio.run(formset.validate_async()))
+        self.assertEqual(
+            formset.errors,
+            {
+                "rows": [
+                    {"name": ["Already exists."]},
+                    {"director": ["Not a valid choice."]},
+                    {"name": ["Already exists."]},
+                ]
+            },
+        )
+
+    def test_update(self):
+        actors = Actor.objects().order_by(Actor.id).run_sync()
+        formset = self.ActorFormSet(
+            formdata=DummyPostData(
+                {
+                    "rows-0-row_pk": str(actors[0].id),
+                    "rows-0-name": "Ann",
+                    "rows-0-director": "1",
+                    "rows-1-row_pk": str(actors[1].id),
+                    "rows-1-name": "Bill",
+                    "rows-1-director": "1",
+                    "rows-2-name": "Cid",
+                    "rows-2-director": "1",
+                }
+            ),
+            rows=actors,
+        )
+        self.assertTrue(asyncio.run(formset.validate_async()))
+        instances = asyncio.run(formset.save())
+        self.assertIs(instances[1], actors[1])
+        self.assertEqual(
+            Actor.select(Actor.name)
+            .order_by(Actor.id)
+            .output(as_list=True)
+            .run_sync(),
+            ["Ann", "Bill", "Cid"],
+        )
+
+    def test_rows_matched_by_primary_key(self):
+        Actor.insert(Actor(name="Cid", director=1)).run_sync()
+        actors = Actor.objects().order_by(Actor.id).run_sync()
+        formset = self.ActorFormSet(rows=actors)
+        self.assertEqual(
+            [form.row_pk.data for form in formset.row_forms()],
+            [i.id for i in actors],
+        )
+
+        # The first row is dropped and the others are reordered.
+        formset = self.ActorFormSet(
+            formdata=DummyPostData(
+                {
+                    "rows-1-row_pk": str(actors[2].id),
+                    "rows-1-name": "Cyd",
+                    "rows-1-director": "1",
+                    "rows-2-row_pk": str(actors[1].id),
+                    "rows-2-name": "Bill",
+                    "rows-2-director": "1",
+                }
+            ),
+            rows=actors,
+        )
+        self.assertTrue(asyncio.run(formset.validate_async()))
+        instances = asyncio.run(formset.save())
+        self.assertEqual(instances, [actors[2], actors[1]])
+        self.assertEqual(
+            Actor.select(Actor.name)
+            .order_by(Actor.id)
+            .output(as_list=True)
+            .run_sync(),
+            ["Ann", "Bill", "Cyd"],
+        )
+
+    def test_unknown_row(self):
+        actors = Actor.objects().order_by(Actor.id).run_sync()
+        formset = self.ActorFormSet(
+            formdata=DummyPostData(
+                {
+                    "rows-0-row_pk": str(actors[0].id),
+                    "rows-0-name": "Ann",
+                    "rows-0-director": "1",
+                    "rows-1-row_pk": str(actors[0].id),
+                    "rows-1-name": "Bill",
+                    "rows-1-director": "1",
+                }
+            ),
+            rows=actors[1:],
+        )
+        self.assertFalse(asyncio.run(formset.validate_async()))
+        self.assertEqual(formset.form_errors, [formset.unknown_row_message])
+        with self.assertRaises(ValueError):
+            asyncio.run(formset.save())
+
+
+class FormPoolTestCase(DBTestCase):
+    def test_reuse(self):
+        pool = FormPool(table_form(Movie, exclude=["id"]))
+        with pool.form(DummyPostData(title="", year="x")) as form:
+            self.assertIs(pool.current(), form)
+            self.assertFalse(form.validate())
+            form.director.choices = [(1, "Director")]
+        self.assertIsNone(pool.current())
+
+        with pool.form(DummyPostData(title="Title", year="2000")) as reused:
+            self.assertIs(reused, form)
+            self.assertEqual(form.errors, {})
+            self.assertIsNone(form.director.choices)
+            self.assertEqual(form.data["title"], "Title")
+            self.assertTrue(form.validate())
+
+    def test_rebind_without_formdata(self):
+        pool = FormPool(table_form(Movie, exclude=["id"]))
+        with pool.form(DummyPostData(title="Title", year="oops")) as form:
+            self.assertFalse(form.validate())
+        with pool.form() as reused:
+            self.assertIs(reused, form)
+            self.assertEqual(form.year._value(), "0")
+            self.assertEqual(form.title._value(), "")
+            self.assertIsNone(form.year.raw_data)
+
+    def test_rebind_select_choices(self):
+        class MovieForm(table_form(Movie, exclude=["id"])):
+            genre = f.SelectField(choices=[("a", "Action")])
+            rating = EnumSelectField(enum_class=Rating)
+
+        pool = FormPool(MovieForm)
+        with pool.form() as form:
+            form.genre.choices = [("b", "Biopic")]
+            form.rating.choices = [("1", "One")]
+        with pool.form() as reused:
+            self.assertIs(reused, form)
+            self.assertEqual(form.genre.choices, [("a", "Action")])
+            self.assertIs(form.rating.choices, MovieForm().rating.choices)
+
+    def test_concurrent_acquire(self):
+        pool = FormPool(table_form(Movie), maxsize=1)
+        first = pool.acquire()
+        second = pool.acquire()
+        self.assertIsNot(first, second)
+        pool.release(first)
+        pool.release(second)
+        self.assertIs(pool.acquire(), first)
+
+    def test_rebind_async_form(self):
+        Movie.insert(Movie(title="Title", year=2000, director=1)).run_sync()
+        movie = Movie.objects().first().run_sync()
+        pool = FormPool(
+            table_form(Movie, base_class=VersionedTableForm, exclude=["id"])
+        )
+        form = pool.acquire()
+        self.assertEqual(form.changed_fields(), ["title", "year", "director"])
+        pool.release(form)
+
+        form = pool.acquire(obj=movie)
+        self.assertEqual(form.changed_fields(), [])
+        self.assertEqual(form.version_token.data, form.get_token(movie))
+        self.assertEqual(form.title.data, "Title")
@@ -0,0 +1,166 @@
+import asyncio
+import io
+import os
+import sqlite3
+import tempfile
+from unittest import TestCase
+
+from piccolo.columns import Boolean, ForeignKey, Integer, Varchar
+from piccolo.engine.sqlite import SQLiteEngine
+from piccolo.table import Table, create_db_tables_sync, drop_db_tables_sync
+from wtforms import Form, StringField
+
+from wtforms_piccolo.importer import TableImporter, read_csv, read_json_lines
+
+DB = SQLiteEngine(
+    path=os.path.join(tempfile.gettempdir(), "wtfp_importer.sqlite")
+)
+
+
+class Product(Table, db=DB):
+    name = Varchar(length=20, required=True)
+    stock = Integer()
+    active = Boolean()
+
+
+class Supplier(Table, db=DB):
+    name = Varchar()
+
+
+class Part(Table, db=DB):
+    sku = Varchar(length=10, unique=True)
+    supplier = ForeignKey(references=Supplier)
+
+
+class TableImporterTestCase(TestCase):
+    def setUp(self):
+        create_db_tables_sync(Product, if_not_exists=True)
+
+    def tearDown(self):
+        drop_db_tables_sync(Product)
+
+    def test_csv(self):
+        file = io.StringIO(
+            "name,stock,active\n"
+            "Pen,10,y\n"
+            ",5,y\n"
+            "Pencil,x,\n"
+            "Paper,1,\n"
+            "Ink,2,y\n"
+        )
+        importer = TableImporter(Product, batch_size=2, exclude=["id"])
+        result = asyncio.run(importer.run(read_csv(file)))
+        self.assertEqual(
+            (result.rows, result.inserted, result.failed), (5, 3, 2)
+        )
+        self.assertEqual([i[0] for i in result.errors], [2, 3])
+        self.assertEqual(list(result.errors[0][1]), ["name"])
+        self.assertGreater(result.rows_per_second, 0)
+        self.assertEqual(
+            Product.select(Product.name, Product.stock, Product.active)
+            .order_by(Product.id)
+            .run_sync(),
+            [
+                {"name": "Pen", "stock": 10, "active": True},
+                {"name": "Paper", "stock": 1, "active": False},
+                {"name": "Ink", "stock": 2, "active": True},
+            ],
+        )
+
+    def test_json_lines_async_iterator(self):
+        file = io.StringIO(
+            '{"name": "Pen", "stock": 10, "active": true}\n'
+            "\n"
+            '{"name": "Paper", "stock": 1, "active": false}\n'
+        )
+
+        async def rows():
+            for row in read_json_lines(file):
+                yield row
+
+        importer = TableImporter(Product, max_errors=0, exclude=["id"])
+        result = asyncio.run(importer.run(rows()))
+        self.assertEqual((result.rows, result.inserted), (2, 2))
+        self.assertEqual(
+            Product.select(Product.active).output(as_list=True).run_sync(),
+            [True, False],
+        )
+
+    def test_max_errors(self):
+        rows = [{"name": ""}] * 5
+        importer = TableImporter(Product, max_errors=2, exclude=["id"])
+        result = asyncio.run(importer.run(rows))
+        self.assertEqual((result.failed, len(result.errors)), (5, 2))
+
+
+class BatchChecksTestCase(TestCase):
+    def setUp(self):
+        create_db_tables_sync(Supplier, Part, if_not_exists=True)
+        Supplier.insert(Supplier(name="Acme")).run_sync()
+        Part.insert(Part(sku="old", supplier=1)).run_sync()
+
+    def tearDown(self):
+        drop_db_tables_sync(Part, Supplier)
+
+    def import_rows(self, rows, **kwargs):
+        importer = TableImporter(Part, batch_size=10, **kwargs)
+        return asyncio.run(importer.run(rows))
+
+    def test_foreign_keys(self):
+        result = self.import_rows(
+            [
+                {"sku": "a", "supplier": "1"},
+                {"sku": "b", "supplier": "2"},
+                {"sku": "c", "supplier": "1"},
+                {"sku": "d"},
+            ],
+            exclude=["id"],
+        )
+        self.assertEqual((result.inserted, result.failed), (3, 1))
+        self.assertEqual(
+            result.errors, [(2, {"supplier": ["Not a valid choice."]})]
+        )
+
+    def test_failed_check(self):
+        # The producer fills the queue while the consumer fails.
+        rows = [{"sku": str(i), "supplier": "1"} for i in range(100)]
+        importer = TableImporter(Part, batch_size=10, exclude=["id"])
+        Supplier.alter().drop_table().run_sync()
+        try:
+            with self.assertRaises(sqlite3.OperationalError):
+                asyncio.run(asyncio.wait_for(importer.run(rows), 5))
+        finally:
+            create_db_tables_sync(Supplier)
+
+    def test_unique(self):
+        result = self.import_rows(
+            [
+                {"sku": "old", "supplier": "1"},
+                {"sku": "new", "supplier": "1"},
+                {"sku": "new", "supplier": "1"},
+            ],
+            exclude=["id"],
+        )
+        self.assertEqual((result.inserted, result.failed), (1, 2))
+        self.assertEqual(
+            result.errors,
+            [
+                (1, {"sku": ["Already exists."]}),
+                (3, {"sku": ["Already exists."]}),
+            ],
+        )
+
+    def test_failed_insert_row_by_row(self):
+        # Without the Unique validator, the duplicate fails the insert.
+        class PartForm(Form):
+            sku = StringField()
+
+        result = self.import_rows(
+            [{"sku": "a"}, {"sku": "old"}, {"sku": "b"}], form_class=PartForm
+        )
+        self.assertEqual((result.inserted, result.failed), (2, 1))
+        self.assertEqual([i[0] for i in result.errors], [2])
+        self.assertEqual(
+            sorted(Part.select(Part.sku).output(as_list=True).run_sync()),
+            ["a", "b", "old"],
+        )
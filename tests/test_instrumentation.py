@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import os
+import tempfile
+from unittest import TestCase
+
+from piccolo.columns import ForeignKey, Varchar
+from piccolo.engine.sqlite import SQLiteEngine
+from piccolo.table import Table, create_db_tables_sync, drop_db_tables_sync
+
+from wtforms_piccolo import instrumentation
+from wtforms_piccolo.forms import AsyncTableForm
+from wtforms_piccolo.instrumentation import LoggingHook, MetricsRegistry
+from wtforms_piccolo.orm import table_form
+
+DB = SQLiteEngine(
+    path=os.path.join(tempfile.gettempdir(), "wtfp_instrumentation.sqlite")
+)
+
+
+class Band(Table, db=DB):
+    name = Varchar()
+
+
+class Concert(Table, db=DB):
+    venue = Varchar(required=True)
+    band = ForeignKey(references=Band)
+
+
+class InstrumentationTestCase(TestCase):
+    def setUp(self):
+        create_db_tables_sync(Band, Concert, if_not_exists=True)
+        Band.insert(Band(name="Pythonistas")).run_sync()
+        self.events = []
+
+    def tearDown(self):
+        drop_db_tables_sync(Band, Concert)
+
+    def test_disabled(self):
+        self.assertFalse(instrumentation.is_enabled())
+        self.assertIsNone(instrumentation.start())
+        instrumentation.emit("build", None, Concert, 3)
+
+    def test_phases(self):
+        with instrumentation.hooked(self.events.append):
+            ConcertForm = table_form(
+                Concert, base_class=AsyncTableForm, exclude=["id"], cache=False
+            )
+            form = ConcertForm(venue="Hall", band=1)
+            asyncio.run(form.band.load_choices())
+            self.assertTrue(asyncio.run(form.validate_async()))
+            asyncio.run(form.save())
+        self.assertFalse(instrumentation.is_enabled())
+
+        self.assertEqual(
+            [(i.phase, i.table, i.field_count, i.field) for i in self.events],
+            [
+                ("convert", "concert", 1, "venue"),
+                ("convert", "concert", 1, "band"),
+                ("build", "concert", 2, None),
+                ("bind", "concert", 2, None),
+                ("choices", "band", 1, "band"),
+                ("validate", "concert", 2, None),
+                ("validate_async", "concert", 2, None),
+                ("save", "concert", 2, None),
+            ],
+        )
+        self.assertTrue(all(i.seconds >= 0 for i in self.events))
+
+    def test_phase_context_manager(self):
+        with instrumentation.hooked(self.events.append):
+            with instrumentation.phase("render", Concert, 2):
+                pass
+        self.assertEqual(self.events[0].phase, "render")
+        self.assertEqual(self.events[0].table, "concert")
+
+    def test_logging_hook(self):
+        with self.assertLogs("wtforms_piccolo", level="DEBUG") as logs:
+            with instrumentation.hooked(LoggingHook()):
+                table_form(Concert, cache=False)
+        self.assertTrue(
+            logs.output[-1].startswith("DEBUG:wtforms_piccolo:build concert:")
+        )
+
+        logger = logging.getLogger("wtfp_quiet")
+        logger.setLevel(logging.INFO)
+        with instrumentation.hooked(LoggingHook(logger)):
+            table_form(Concert, cache=False)
+
+    def test_metrics_registry(self):
+        metrics = MetricsRegistry(buckets=[0.5, 60])
+        with instrumentation.hooked(metrics):
+            table_form(Concert, cache=False)
+            table_form(Concert, cache=False)
+        self.assertEqual(metrics.counters[("build", "concert")], 2)
+        self.assertEqual(metrics.counters[("convert", "concert")], 6)
+        snapshot = metrics.snapshot()[("build", "concert")]
+        self.assertEqual(snapshot["count"], 2)
+        self.assertEqual(snapshot["buckets"][60], 2)
+        self.assertEqual(snapshot["buckets"][float("inf")], 2)
+
+        metrics.reset()
+        self.assertEqual(metrics.snapshot(), {})
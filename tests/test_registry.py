@@ -0,0 +1,126 @@
+import json
+import os
+import subprocess
+import sys
+from enum import Enum
+from unittest import TestCase
+from unittest.mock import patch
+
+from piccolo.columns import ForeignKey, Integer, Varchar
+from piccolo.table import Table
+
+from wtforms_piccolo.forms import AsyncTableForm
+from wtforms_piccolo.orm import table_form
+from wtforms_piccolo.registry import FormRegistry, table_fingerprint
+from wtforms_piccolo.rendering import FormRenderer
+
+
+class Level(Enum):
+    low = 1
+    high = 2
+
+
+class Owner(Table):
+    name = Varchar(length=50)
+
+
+class Chore(Table):
+    title = Varchar(length=100, required=True)
+    level = Integer(choices=Level, default=1)
+    owner = ForeignKey(references=Owner)
+
+
+class TableFingerprintTestCase(TestCase):
+    def test_deterministic(self):
+        fingerprint = table_fingerprint(Chore)
+        self.assertEqual(len(fingerprint), 32)
+        self.assertEqual(table_fingerprint(Chore), fingerprint)
+
+        # The same in another process.
+        code = (
+            f"import sys; sys.path.insert(0, {os.path.dirname(__file__)!r}); "
+            "from test_registry import Chore; "
+            "from wtforms_piccolo.registry import table_fingerprint; "
+            "print(table_fingerprint(Chore))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        self.assertEqual(output, fingerprint)
+
+    def test_schema_changes(self):
+        class Chore(Table):
+            title = Varchar(length=200, required=True)
+            level = Integer(choices=Level, default=1)
+            owner = ForeignKey(references=Owner)
+
+        self.assertNotEqual(
+            table_fingerprint(Chore), table_fingerprint(globals()["Chore"])
+        )
+
+
+class FormRegistryTestCase(TestCase):
+    def setUp(self):
+        self.registry = FormRegistry()
+        self.registry.register(
+            Chore, base_class=AsyncTableForm, exclude=["id"]
+        )
+        self.registry.register(Chore, name="chore_title", only=["title"])
+
+    def test_preload(self):
+        renderer = FormRenderer()
+        with patch("wtforms_piccolo.registry.gc") as gc:
+            self.registry.preload(renderers=(renderer,), freeze_gc=True)
+        gc.freeze.assert_called_once_with()
+        with patch("wtforms_piccolo.registry.gc") as gc:
+            self.registry.preload()
+        gc.freeze.assert_not_called()
+
+        ChoreForm = self.registry.get(Chore)
+        self.assertIs(
+            ChoreForm,
+            table_form(Chore, base_class=AsyncTableForm, exclude=["id"]),
+        )
+        self.assertEqual(
+            list(self.registry["chore_title"]()._fields), ["title"]
+        )
+        # Filled before the workers fork, not on their first request.
+        self.assertIsNotNone(ChoreForm._unbound_fields)
+        self.assertIsNotNone(ChoreForm._wtforms_meta)
+        self.assertIn(ChoreForm, renderer._plans)
+
+    def test_frozen(self):
+        self.registry.preload()
+        self.assertTrue(self.registry.frozen)
+        with self.assertRaises(RuntimeError):
+            self.registry.register(Owner)
+        with self.assertRaises(KeyError):
+            self.registry.get(Owner)
+
+    def test_get_before_preload(self):
+        self.assertIn(Chore, self.registry)
+        self.assertNotIn(Owner, self.registry)
+        ChoreForm = self.registry.get("chore")
+        self.assertIs(self.registry.get(Chore), ChoreForm)
+        self.assertEqual(len(self.registry.entries()), 1)
+        with self.assertRaises(KeyError):
+            self.registry.get(Owner)
+
+    def test_manifest_and_stale(self):
+        self.registry.preload()
+        manifest = json.loads(json.dumps(self.registry.manifest()))
+        self.assertEqual(
+            manifest["chore_title"],
+            {"table": "chore", "fingerprint": table_fingerprint(Chore)},
+        )
+        self.assertEqual(self.registry.stale(), [])
+        self.assertEqual(self.registry.stale(manifest), [])
+
+        manifest["chore"]["fingerprint"] = "0" * 32
+        del manifest["chore_title"]
+        self.assertEqual(
+            self.registry.stale(manifest), ["chore", "chore_title"]
+        )
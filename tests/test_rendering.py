@@ -0,0 +1,150 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from markupsafe import escape
+from piccolo.columns import (
+    Boolean,
+    ForeignKey,
+    Integer,
+    Numeric,
+    Text,
+    Varchar,
+)
+from piccolo.engine.sqlite import SQLiteEngine
+from piccolo.table import Table
+from wtforms import Form
+from wtforms.fields import SelectField
+
+from wtforms_piccolo import instrumentation
+from wtforms_piccolo.forms import VersionedTableForm
+from wtforms_piccolo.orm import table_form
+from wtforms_piccolo.rendering import FormRenderer, render_form
+
+DB = SQLiteEngine(
+    path=os.path.join(tempfile.gettempdir(), "wtfp_rendering.sqlite")
+)
+
+
+class Author(Table, db=DB):
+    name = Varchar()
+
+
+class Post(Table, db=DB):
+    title = Varchar(length=100, required=True)
+    body = Text()
+    views = Integer()
+    rating = Numeric(digits=(3, 1))
+    published = Boolean()
+    author = ForeignKey(references=Author)
+
+
+class DummyPostData(dict):
+    def getlist(self, key):
+        return [self[key]]
+
+
+def reference_render(form: Form, renderer: FormRenderer) -> str:
+    """
+    Renders a form field by field, as a template looping over the fields.
+    """
+    out = [
+        renderer.error_template.format(error=escape(i))
+        for i in form.form_errors
+    ]
+    for field in form:
+        errors = "".join(
+            renderer.error_template.format(error=escape(i))
+            for i in field.errors
+        )
+        template = (
+            renderer.hidden_template
+            if field.flags.hidden
+            else renderer.row_template
+        )
+        out.append(
+            template.format(
+                label=field.label(),
+                widget=field(**renderer.widget_kw),
+                errors=errors,
+            )
+        )
+    return "".join(out)
+
+
+class RenderFormTestCase(TestCase):
+    def setUp(self):
+        self.renderer = FormRenderer(widget_kw={"class": "form-control"})
+        self.PostForm = table_form(Post)
+
+    def assertRendersLikeWidgets(self, form):
+        self.assertEqual(
+            self.renderer.render(form), reference_render(form, self.renderer)
+        )
+
+    def test_empty(self):
+        self.assertRendersLikeWidgets(self.PostForm())
+
+    def test_values_and_errors(self):
+        form = self.PostForm(
+            DummyPostData(
+                title='<script>"x"</script>',
+                body="a & b",
+                views="abc",
+                rating="12.5",
+                published="y",
+                author="2",
+            )
+        )
+        form.author.choices = [(1, "Ann"), (2, "<Bob>")]
+        form.validate()
+        self.assertTrue(form.errors)
+        self.assertRendersLikeWidgets(form)
+        html = self.renderer.render(form)
+        self.assertIn("&lt;script&gt;", html)
+        self.assertIn('<option selected value="2">', html)
+        self.assertIn("checked", html)
+
+    def test_second_instance(self):
+        self.renderer.render(self.PostForm())
+        form = self.PostForm(title="Second", published=False)
+        self.assertRendersLikeWidgets(form)
+        self.assertNotIn("checked", self.renderer.render(form))
+
+    def test_prefix(self):
+        self.renderer.render(self.PostForm())
+        self.assertRendersLikeWidgets(self.PostForm(prefix="post-"))
+
+    def test_hidden_and_form_errors(self):
+        AuthorForm = table_form(Author, base_class=VersionedTableForm)
+        form = AuthorForm(obj=Author(name="Old"))
+        form.form_errors.append("Conflict <retry>")
+        self.assertRendersLikeWidgets(form)
+        self.assertTrue(
+            self.renderer.render(form).startswith(
+                '<span class="error">Conflict &lt;retry&gt;</span>'
+            )
+        )
+
+    def test_select_groups(self):
+        class ColorForm(Form):
+            color = SelectField(
+                choices={"Warm": [("r", "Red")], "Cold": [("b", "Blue")]}
+            )
+
+        self.assertRendersLikeWidgets(ColorForm(color="b"))
+
+    def test_invalidate(self):
+        form = self.PostForm()
+        self.renderer.render(form)
+        self.assertIn(self.PostForm, self.renderer._plans)
+        self.renderer.invalidate(self.PostForm)
+        self.assertNotIn(self.PostForm, self.renderer._plans)
+
+    def test_render_form(self):
+        events = []
+        with instrumentation.hooked(events.append):
+            html = render_form(self.PostForm(title="Title"))
+        self.assertIn('value="Title"', html)
+        self.assertEqual(events[-1].phase, "render")
+        self.assertEqual(events[-1].table, "post")
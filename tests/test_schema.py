@@ -0,0 +1,120 @@
+import json
+from unittest import TestCase
+
+from piccolo.columns import (
+    UUID,
+    Array,
+    Boolean,
+    Date,
+    ForeignKey,
+    Integer,
+    Numeric,
+    Time,
+    Timestamp,
+    Varchar,
+)
+from piccolo.table import Table
+from wtforms import Form
+from wtforms.fields import SelectField
+
+from wtforms_piccolo.orm import table_fields, table_form
+from wtforms_piccolo.schema import form_schema, invalidate_schemas
+
+
+class Publisher(Table):
+    name = Varchar()
+
+
+class Book(Table):
+    title = Varchar(length=120, required=True)
+    isbn = UUID(null=True)
+    pages = Integer()
+    price = Numeric(digits=(6, 2))
+    in_print = Boolean()
+    published = Timestamp()
+    publisher = ForeignKey(references=Publisher)
+
+
+class FormSchemaTestCase(TestCase):
+    def setUp(self):
+        invalidate_schemas()
+
+    def test_schema(self):
+        BookForm = table_form(Book, exclude=["id"])
+        schema = form_schema(BookForm, choices_url="/choices/{table}/").schema
+        self.assertEqual(schema["type"], "object")
+        self.assertEqual(schema["required"], ["title"])
+
+        properties = schema["properties"]
+        self.assertEqual(list(properties), list(BookForm()._fields))
+        self.assertEqual(
+            properties["title"],
+            {
+                "type": "string",
+                "title": "Title",
+                "default": "",
+                "maxLength": 120,
+            },
+        )
+        self.assertEqual(properties["isbn"]["type"], ["string", "null"])
+        self.assertEqual(properties["isbn"]["format"], "uuid")
+        self.assertEqual(properties["pages"]["type"], "integer")
+        self.assertEqual(properties["pages"]["maximum"], 2**31 - 1)
+        self.assertEqual(properties["price"]["type"], "number")
+        self.assertEqual(properties["price"]["multipleOf"], 0.01)
+        self.assertEqual(properties["price"]["exclusiveMaximum"], 10**4)
+        self.assertEqual(properties["in_print"]["type"], "boolean")
+        self.assertEqual(properties["published"]["format"], "date-time")
+        self.assertEqual(properties["publisher"]["type"], ["integer", "null"])
+        self.assertEqual(
+            properties["publisher"]["x-choices-url"], "/choices/publisher/"
+        )
+
+    def test_json_and_etag(self):
+        BookForm = table_form(Book, exclude=["id"])
+        exported = form_schema(BookForm)
+        self.assertEqual(json.loads(exported.json), exported.schema)
+        self.assertTrue(exported.etag.startswith('"'))
+
+        OtherForm = table_form(Book, only=["title"])
+        self.assertNotEqual(form_schema(OtherForm).etag, exported.etag)
+
+    def test_cache(self):
+        BookForm = table_form(Book)
+        exported = form_schema(BookForm)
+        self.assertIs(form_schema(BookForm), exported)
+        self.assertIsNot(form_schema(BookForm, choices_url="/c/"), exported)
+
+        invalidate_schemas(BookForm)
+        self.assertIsNot(form_schema(BookForm), exported)
+        self.assertEqual(form_schema(BookForm).etag, exported.etag)
+
+    def test_table_fields(self):
+        schema = form_schema(table_fields(Book, only=["title"])).schema
+        self.assertEqual(list(schema["properties"]), ["title"])
+
+    def test_select_choices(self):
+        class ColorForm(Form):
+            color = SelectField(choices=[("r", "Red"), ("g", "Green")])
+
+        schema = form_schema(ColorForm).schema
+        self.assertEqual(schema["properties"]["color"]["enum"], ["r", "g"])
+
+    def test_html5_attributes(self):
+        form = table_form(Book, exclude=["id"])()
+        self.assertIn('maxlength="120"', form.title())
+        self.assertIn("required", form.title())
+        self.assertIn('step="0.01"', form.price())
+        self.assertIn('max="2147483647"', form.pages())
+
+    def test_column_types(self):
+        class Event(Table):
+            tags = Array(base_column=Varchar())
+            starts_at = Time()
+            day = Date()
+
+        schema = form_schema(table_form(Event, exclude=["id"])).schema
+        properties = schema["properties"]
+        self.assertEqual(properties["tags"]["type"], "array")
+        self.assertEqual(properties["starts_at"]["format"], "time")
+        self.assertEqual(properties["day"]["format"], "date")
@@ -1,23 +1,62 @@
+import datetime
+import io
+import uuid
 from decimal import Decimal
-from unittest import TestCase
+from enum import Enum
+from importlib.util import find_spec
+from types import SimpleNamespace
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
 
 from piccolo.columns import (
+    JSONB,
+    UUID,
+    Array,
+    BigInt,
     Boolean,
+    Bytea,
+    Column,
     Date,
+    DoublePrecision,
+    Email,
     ForeignKey,
     Integer,
+    Interval,
     Numeric,
+    Secret,
     Serial,
+    SmallInt,
     Text,
+    Time,
     Timestamp,
+    Timestamptz,
     Varchar,
 )
+from piccolo.columns.choices import Choice
 from piccolo.columns.defaults.date import DateNow
 from piccolo.columns.defaults.timestamp import TimestampNow
+from piccolo.conf.apps import AppConfig
 from piccolo.table import Table
 from wtforms import fields as f
+from wtforms.validators import Length
 
-from wtforms_piccolo.orm import table_form
+from wtforms_piccolo.fields import (
+    BytesField,
+    DateTimeTZField,
+    EnumSelectField,
+    IntervalField,
+    JSONField,
+    ListField,
+    SecretField,
+    enum_choices,
+)
+from wtforms_piccolo.orm import (
+    TableConverter,
+    form_cache,
+    table_fields,
+    table_form,
+    warm_forms,
+)
 
 
 class Author(Table):
@@ -168,7 +207,8 @@ class WTFPiccoloTestCase(TestCase):
         self.assertTrue(isinstance(form.title, f.StringField))
         self.assertTrue(isinstance(form.content, f.TextAreaField))
         self.assertTrue(isinstance(form.created, f.DateTimeField))
-        self.assertTrue(isinstance(form.price, f.FloatField))
+        self.assertTrue(isinstance(form.price, f.DecimalField))
+        self.assertEqual(form.price.places, 2)
 
     def test_validators(self):
         BookForm = table_form(Book)
@@ -200,3 +240,478 @@ class WTFPiccoloTestCase(TestCase):
             },
         )
         self.assertTrue(form.validate())
+
+
+class FormCacheTestCase(TestCase):
+    def setUp(self):
+        form_cache.clear()
+
+    def test_cached_form_class(self):
+        BookForm = table_form(Book, exclude=["id"])
+        self.assertIs(table_form(Book, exclude=["id"]), BookForm)
+        self.assertIsNot(table_form(Book, exclude=["id", "rating"]), BookForm)
+        info = form_cache.info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 2, 2))
+
+    def test_field_args_key(self):
+        BookForm = table_form(
+            Book, only=["title"], field_args={"title": {"label": "A"}}
+        )
+        self.assertIs(
+            table_form(
+                Book, only=["title"], field_args={"title": {"label": "A"}}
+            ),
+            BookForm,
+        )
+        self.assertIsNot(
+            table_form(
+                Book, only=["title"], field_args={"title": {"label": "B"}}
+            ),
+            BookForm,
+        )
+
+    def test_generator_arguments(self):
+        BookForm = table_form(Book, only=(i for i in ["title", "rating"]))
+        self.assertEqual(list(BookForm()._fields), ["title", "rating"])
+        form_class = table_form(Book, exclude=(i for i in ["id"]))
+        self.assertNotIn("id", form_class()._fields)
+        self.assertIs(table_form(Book, only=["title", "rating"]), BookForm)
+
+    def test_validator_instances_not_cached(self):
+        def make_form():
+            return table_form(
+                Book,
+                only=["title"],
+                field_args={"title": {"validators": [Length(max=5)]}},
+            )
+
+        self.assertIsNot(make_form(), make_form())
+        self.assertEqual(form_cache.info().currsize, 0)
+
+    def test_no_cache(self):
+        self.assertIsNot(
+            table_form(Book, cache=False), table_form(Book, cache=False)
+        )
+        self.assertEqual(form_cache.info().currsize, 0)
+
+    def test_invalidate(self):
+        BookForm = table_form(Book)
+        table_form(Author)
+        form_cache.invalidate(Book)
+        self.assertEqual(form_cache.info().currsize, 1)
+        self.assertIsNot(table_form(Book), BookForm)
+        form_cache.invalidate()
+        self.assertEqual(form_cache.info().currsize, 0)
+
+    def test_maxsize(self):
+        maxsize = form_cache.maxsize
+        form_cache.maxsize = 1
+        try:
+            table_form(Book)
+            table_form(Author)
+            self.assertEqual(form_cache.info().currsize, 1)
+        finally:
+            form_cache.maxsize = maxsize
+
+
+class TitleVarchar(Varchar):
+    pass
+
+
+class Magazine(Table):
+    title = TitleVarchar(required=True)
+    issue = Integer()
+
+
+class TableConverterTestCase(TestCase):
+    def test_subclassed_column(self):
+        fields = table_fields(Magazine, converter=TableConverter())
+        self.assertEqual(list(fields.keys()), ["id", "title", "issue"])
+        self.assertIs(fields["title"].field_class, f.StringField)
+
+    def test_compile_cached(self):
+        converter = TableConverter()
+        plan = converter.compile(Magazine)
+        self.assertIs(converter.compile(Magazine), plan)
+        self.assertEqual([i.name for i in plan], ["id", "title", "issue"])
+        self.assertEqual(len(plan[1].validators), 1)
+        converter.invalidate(Magazine)
+        self.assertIsNot(converter.compile(Magazine), plan)
+
+    def test_convert_plan_lookup(self):
+        converter = TableConverter()
+        with patch.object(
+            converter, "compile", wraps=converter.compile
+        ) as compile:
+            for column in Magazine._meta.columns:
+                self.assertIsNotNone(converter.convert(Magazine, column))
+        self.assertEqual(compile.call_count, 1)
+        self.assertIsNone(converter.convert(Magazine, Book.title))
+
+    def test_field_args_validators_not_mutated(self):
+        field_validators: list = []
+        table_fields(
+            Magazine, field_args={"title": {"validators": field_validators}}
+        )
+        self.assertEqual(field_validators, [])
+
+    def test_overridden_convert(self):
+        class UpperConverter(TableConverter):
+            def convert(self, table, prop, field_args=None):
+                field = super().convert(table, prop, field_args)
+                field.kwargs["label"] = field.kwargs["label"].upper()
+                return field
+
+        fields = table_fields(Magazine, converter=UpperConverter())
+        self.assertEqual(fields["issue"].kwargs["label"], "ISSUE")
+
+    def test_overridden_convert_custom_column(self):
+        class Point(Column):
+            value_type = str
+
+        class Place(Table):
+            name = Varchar()
+            point = Point()
+
+        class PointConverter(TableConverter):
+            def convert(self, table, prop, field_args=None):
+                if isinstance(prop, Point):
+                    return f.StringField(label="Point")
+                return super().convert(table, prop, field_args)
+
+        fields = table_fields(Place, converter=PointConverter())
+        self.assertEqual(list(fields), ["id", "name", "point"])
+
+
+class WarmFormsTestCase(TestCase):
+    def setUp(self):
+        form_cache.clear()
+
+    def test_warm_tables(self):
+        timings = warm_forms([Author, Book], exclude=["id"])
+        self.assertEqual([i.table for i in timings], [Author, Book])
+        self.assertTrue(all(i.seconds >= 0 for i in timings))
+        self.assertIs(table_form(Book, exclude=["id"]), timings[1].form_class)
+        self.assertEqual(form_cache.info().hits, 1)
+
+    def test_warm_app_config_threaded(self):
+        app_config = AppConfig(
+            app_name="books",
+            migrations_folder_path="",
+            table_classes=[Author, Book, Magazine],
+        )
+        timings = warm_forms(app_config, max_workers=2)
+        self.assertEqual([i.table for i in timings], [Author, Book, Magazine])
+        self.assertEqual(form_cache.info().currsize, 3)
+
+
+class DummyPostData(dict):
+    def getlist(self, key):
+        return [self[key]]
+
+
+class NumericFieldsTestCase(TestCase):
+    def test_integer(self):
+        BookForm = table_form(Book, only=["rating"])
+        self.assertEqual(
+            BookForm(DummyPostData(rating=" 42 ")).rating.data, 42
+        )
+        self.assertEqual(BookForm(DummyPostData(rating="-1")).rating.data, -1)
+        self.assertIsNone(BookForm(DummyPostData(rating="")).rating.data)
+        self.assertIsNone(BookForm(DummyPostData(rating=" ")).rating.data)
+        for value in ["1_000", "1.0", "١", "x"]:
+            form = BookForm(DummyPostData(rating=value))
+            self.assertIsNone(form.rating.data)
+            self.assertFalse(form.validate())
+
+    def test_decimal(self):
+        BookForm = table_form(Book, only=["price"])
+        form = BookForm(DummyPostData(price="10.05"))
+        self.assertEqual(form.price.data, Decimal("10.05"))
+        self.assertEqual(
+            BookForm(DummyPostData(price=0.1)).price.data, Decimal("0.1")
+        )
+        for value in ["NaN", "Infinity", "x"]:
+            form = BookForm(DummyPostData(price=value))
+            self.assertIsNone(form.price.data)
+            self.assertFalse(form.validate())
+
+    def test_boolean(self):
+        BookForm = table_form(Book, only=["released"])
+        self.assertTrue(BookForm(DummyPostData(released="y")).released.data)
+        for value in ["", "0", "off", "false"]:
+            form = BookForm(DummyPostData(released=value))
+            self.assertFalse(form.released.data)
+
+
+class Measurement(Table):
+    code = Varchar(length=5)
+    token = UUID(null=True)
+    small = SmallInt(null=True)
+    big = BigInt(null=True)
+    quantity = Integer()
+    amount = Numeric(digits=(5, 2), null=True)
+    rate = Numeric(digits=(2, 2), null=True)
+
+
+class SchemaValidatorsTestCase(TestCase):
+    def validate(self, **data):
+        MeasurementForm = table_form(Measurement, exclude=["id"])
+        form = MeasurementForm(DummyPostData({"quantity": "1", **data}))
+        form.validate()
+        return form.errors
+
+    def test_valid(self):
+        self.assertEqual(self.validate(), {})
+        self.assertEqual(
+            self.validate(
+                code="abcde",
+                token="4b7f0f1e-7c6d-4c8e-9d4f-2a1b3c4d5e6f",
+                small="32767",
+                big=str(2**63 - 1),
+                amount="999.99",
+            ),
+            {},
+        )
+
+    def test_varchar_length(self):
+        self.assertEqual(list(self.validate(code="abcdef")), ["code"])
+
+    def test_uuid(self):
+        self.assertEqual(list(self.validate(token="abc")), ["token"])
+
+    def test_uuid_values(self):
+        MeasurementForm = table_form(Measurement, only=["token", "code"])
+        # The UUID4() default, and the uuid.UUID of a row.
+        form = MeasurementForm(DummyPostData(code="a"))
+        self.assertTrue(form.validate())
+        form = MeasurementForm(obj=SimpleNamespace(token=uuid.uuid4()))
+        self.assertTrue(form.validate())
+
+    def test_integer_ranges(self):
+        self.assertEqual(list(self.validate(small="32768")), ["small"])
+        self.assertEqual(list(self.validate(big=str(2**63))), ["big"])
+        self.assertEqual(
+            list(self.validate(quantity=str(2**31))), ["quantity"]
+        )
+
+    def test_numeric_digits(self):
+        self.assertEqual(list(self.validate(amount="1000")), ["amount"])
+        self.assertEqual(list(self.validate(amount="1.005")), ["amount"])
+        self.assertEqual(self.validate(amount="1.50"), {})
+
+    def test_numeric_zero(self):
+        for value in ["0", "0.00", "-0", "0.99"]:
+            self.assertEqual(self.validate(rate=value), {})
+        self.assertEqual(list(self.validate(rate="1")), ["rate"])
+
+    def test_not_null(self):
+        self.assertEqual(
+            self.validate(quantity=""),
+            {"quantity": ["This field can't be empty."]},
+        )
+        self.assertEqual(
+            self.validate(quantity="oops"),
+            {"quantity": ["Not a valid integer value."]},
+        )
+
+
+class Document(Table):
+    body = JSONB(null=True)
+    tags = Array(base_column=Varchar())
+    scores = Array(base_column=Integer())
+    flags = Array(base_column=Boolean())
+    grid = Array(base_column=Array(base_column=Integer()))
+    duration = Interval()
+    starts_at = Time()
+    published = Timestamptz()
+    token = Secret(length=20)
+    attachment = Bytea()
+    ratio = DoublePrecision()
+
+
+class ColumnTypesTestCase(TestCase):
+    def setUp(self):
+        self.DocumentForm = table_form(Document, exclude=["id"])
+
+    def test_field_types(self):
+        form = self.DocumentForm()
+        self.assertIsInstance(form.body, JSONField)
+        self.assertIsInstance(form.tags, ListField)
+        self.assertIsInstance(form.duration, IntervalField)
+        self.assertIsInstance(form.starts_at, f.TimeField)
+        self.assertIsInstance(form.published, DateTimeTZField)
+        self.assertIsInstance(form.token, SecretField)
+        self.assertIsInstance(form.attachment, BytesField)
+        self.assertIsInstance(form.ratio, f.FloatField)
+        self.assertNotIn("grid", form)
+
+    def test_default_values(self):
+        form = self.DocumentForm()
+        self.assertEqual(form.duration.data, datetime.timedelta())
+        self.assertEqual(form.tags.data, [])
+        self.assertIsNotNone(form.published.data.tzinfo)
+        self.assertIn('value="0:00:00"', form.duration())
+
+    def test_json(self):
+        form = self.DocumentForm(DummyPostData(body='{"a": [1, 2]}'))
+        self.assertEqual(form.body.data, '{"a": [1, 2]}')
+        self.assertIsNone(self.DocumentForm(DummyPostData(body=" ")).body.data)
+        for value in ["{", "[" * 100_000, "[%s0]" % ("1," * 2**19)]:
+            form = self.DocumentForm(DummyPostData(body=value))
+            self.assertIsNone(form.body.data)
+            self.assertFalse(form.validate())
+            self.assertIn("body", form.errors)
+
+    def test_array(self):
+        form = self.DocumentForm(
+            DummyPostData(tags=" a, b,,c ", scores="1, 2", flags="true,0")
+        )
+        self.assertEqual(form.tags.data, ["a", "b", "c"])
+        self.assertEqual(form.scores.data, [1, 2])
+        self.assertEqual(form.flags.data, [True, False])
+        self.assertIn('value="a, b, c"', form.tags())
+
+        form = self.DocumentForm(DummyPostData(scores="1, x"))
+        self.assertIsNone(form.scores.data)
+        self.assertFalse(form.validate())
+        self.assertIn('value="1, x"', form.scores())
+
+    def test_interval(self):
+        for value, expected in [
+            ("2 days, 1:30:00", datetime.timedelta(days=2, minutes=90)),
+            ("1 day", datetime.timedelta(days=1)),
+            ("0:01:30.5", datetime.timedelta(seconds=90.5)),
+            ("-1 day, 23:00:00", datetime.timedelta(hours=-1)),
+            ("90", datetime.timedelta(seconds=90)),
+        ]:
+            form = self.DocumentForm(DummyPostData(duration=value))
+            self.assertEqual(form.duration.data, expected)
+        for value in [
+            "1:60",
+            "x",
+            "1:2:3:4",
+            "1e400",
+            "99999999999 days",
+            "99999999999 days, 1:00:00",
+            "99999999999:00",
+        ]:
+            form = self.DocumentForm(DummyPostData(duration=value))
+            self.assertIsNone(form.duration.data)
+            self.assertIn(
+                "Not a valid interval.", form.duration.process_errors
+            )
+
+    def test_time_and_timestamptz(self):
+        form = self.DocumentForm(
+            DummyPostData(starts_at="10:30", published="2024-01-01 10:00:00")
+        )
+        self.assertEqual(form.starts_at.data, datetime.time(10, 30))
+        self.assertEqual(
+            form.published.data,
+            datetime.datetime(2024, 1, 1, 10, tzinfo=datetime.timezone.utc),
+        )
+        offset = datetime.timezone(datetime.timedelta(hours=2))
+        form = self.DocumentForm(
+            published=datetime.datetime(2024, 1, 1, 12, tzinfo=offset)
+        )
+        self.assertIn('value="2024-01-01 10:00:00"', form.published())
+
+    def test_secret(self):
+        TokenForm = table_form(Document, only=["token"])
+        row = SimpleNamespace(token="s3cret")
+        form = TokenForm(DummyPostData(token=""), obj=row)
+        self.assertEqual(form.token.data, "s3cret")
+        self.assertNotIn("s3cret", form.token())
+        form = TokenForm(DummyPostData(token="new"), obj=row)
+        self.assertEqual(form.token.data, "new")
+        form = TokenForm(DummyPostData(token="x" * 21))
+        self.assertFalse(form.validate())
+
+    def test_bytes(self):
+        form = self.DocumentForm(DummyPostData(attachment=io.BytesIO(b"ab")))
+        self.assertEqual(form.attachment.data, b"ab")
+        form = self.DocumentForm(
+            DummyPostData(attachment=io.BytesIO(b"x" * (2**20 + 1)))
+        )
+        self.assertIsNone(form.attachment.data)
+        self.assertFalse(form.validate())
+
+
+@skipUnless(find_spec("email_validator"), "email_validator not installed")
+class EmailTestCase(TestCase):
+    def test_email(self):
+        class Subscriber(Table):
+            email = Email(length=30)
+
+        form = table_form(Subscriber, only=["email"])(
+            DummyPostData(email="not an email")
+        )
+        self.assertIsInstance(form.email, f.EmailField)
+        self.assertFalse(form.validate())
+
+
+class Priority(Enum):
+    low = 1
+    high = Choice(value=2, display_name="Urgent")
+
+
+class Status(str, Enum):
+    to_do = "to_do"
+    done = "done"
+
+
+class Ticket(Table):
+    priority = Integer(choices=Priority, default=1)
+    status = Varchar(choices=Status, null=True)
+
+
+class EnumChoicesTestCase(TestCase):
+    def setUp(self):
+        self.TicketForm = table_form(Ticket, exclude=["id"])
+
+    def test_field(self):
+        form = self.TicketForm()
+        self.assertIsInstance(form.priority, EnumSelectField)
+        self.assertEqual(
+            list(form.priority.choices), [(1, "Low"), (2, "Urgent")]
+        )
+        self.assertEqual(
+            list(form.status.choices), [("to_do", "To Do"), ("done", "Done")]
+        )
+        self.assertIn(
+            '<option selected value="1">Low</option>', form.priority()
+        )
+
+    def test_shared_choices(self):
+        first, second = self.TicketForm(), self.TicketForm()
+        self.assertIs(first.priority.choices, second.priority.choices)
+        self.assertIs(enum_choices(Priority), enum_choices(Priority))
+        self.assertEqual(enum_choices(Priority).values, {1, 2})
+
+    def test_validate(self):
+        form = self.TicketForm(DummyPostData(priority="2", status="done"))
+        self.assertTrue(form.validate())
+        self.assertEqual(form.data, {"priority": 2, "status": "done"})
+        form = self.TicketForm(DummyPostData(priority="3", status="x"))
+        self.assertFalse(form.validate())
+        self.assertEqual(list(form.errors), ["priority", "status"])
+        form = self.TicketForm(DummyPostData(priority="1", status=""))
+        self.assertTrue(form.validate())
+
+    def test_enum_member_data(self):
+        form = self.TicketForm(priority=Priority.high, status=Status.done)
+        self.assertEqual(form.priority.data, 2)
+        self.assertEqual(form.status.data, "done")
+
+    def test_replaced_choices(self):
+        form = self.TicketForm(DummyPostData(priority="2"))
+        form.priority.choices = [(1, "Low")]
+        self.assertFalse(form.validate())
+
+    def test_custom_converters(self):
+        converter = TableConverter(
+            {"Integer": TableConverter.default_converters["Integer"]}
+        )
+        form = table_form(Ticket, converter=converter, cache=False)()
+        self.assertIsInstance(form.priority, f.IntegerField)
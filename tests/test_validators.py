@@ -0,0 +1,87 @@
+import asyncio
+import os
+import tempfile
+from unittest import TestCase
+
+from piccolo.columns import Varchar
+from piccolo.engine.sqlite import SQLiteEngine
+from piccolo.table import Table, create_db_tables_sync, drop_db_tables_sync
+
+from wtforms_piccolo.forms import AsyncTableForm
+from wtforms_piccolo.orm import table_form
+from wtforms_piccolo.validators import Unique, validate_unique
+
+DB = SQLiteEngine(
+    path=os.path.join(tempfile.gettempdir(), "wtfp_validators.sqlite")
+)
+
+
+class Account(Table, db=DB):
+    username = Varchar(unique=True)
+    email = Varchar(unique=True)
+    name = Varchar()
+
+
+class UniqueTestCase(TestCase):
+    def setUp(self):
+        create_db_tables_sync(Account, if_not_exists=True)
+        Account.insert(
+            Account(username="bob", email="bob@example.com", name="Bob"),
+            Account(username="sue", email="sue@example.com", name="Sue"),
+        ).run_sync()
+
+    def tearDown(self):
+        drop_db_tables_sync(Account)
+
+    def test_generated_validators(self):
+        form = table_form(Account)()
+        for field in (form.username, form.email):
+            self.assertTrue(
+                any(isinstance(i, Unique) for i in field.validators)
+            )
+        self.assertFalse(
+            any(isinstance(i, Unique) for i in form.name.validators)
+        )
+        self.assertFalse(
+            any(isinstance(i, Unique) for i in form.id.validators)
+        )
+
+    def test_sync_validate(self):
+        form = table_form(Account)(username="bob")
+        self.assertTrue(form.validate())
+
+    def test_validate_async(self):
+        AccountForm = table_form(
+            Account, base_class=AsyncTableForm, exclude=["id"]
+        )
+        form = AccountForm(username="bob", email="sue@example.com", name="New")
+        self.assertFalse(asyncio.run(form.validate_async()))
+        self.assertEqual(
+            form.errors,
+            {"username": ["Already exists."], "email": ["Already exists."]},
+        )
+
+        form = AccountForm(username="ann", email="ann@example.com")
+        self.assertTrue(asyncio.run(form.validate_async()))
+
+    def test_edit_excludes_current_row(self):
+        AccountForm = table_form(
+            Account, base_class=AsyncTableForm, exclude=["id"]
+        )
+        bob = Account.objects().get(Account.username == "bob").run_sync()
+        form = AccountForm(obj=bob)
+        self.assertTrue(asyncio.run(form.validate_async()))
+
+        form = AccountForm(obj=bob)
+        form.username.data = "sue"
+        self.assertFalse(asyncio.run(form.validate_async()))
+        self.assertEqual(list(form.errors), ["username"])
+
+    def test_message(self):
+        form = table_form(Account)(username="bob")
+        validator = Unique(Account.username, message="Taken.")
+        result = asyncio.run(
+            validate_unique(form, [(form.username, validator)])
+        )
+        self.assertFalse(result)
+        self.assertEqual(form.username.errors, ["Taken."])
@@ -0,0 +1,905 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import decimal
+import enum
+import json
+import threading
+import time
+import typing as t
+import weakref
+from collections import OrderedDict, namedtuple
+
+from piccolo.columns import ForeignKey, Or, Text, Varchar
+from piccolo.columns.choices import Choice
+from piccolo.columns.combination import Combinable
+from piccolo.columns.readable import Readable
+from piccolo.query import Select
+from piccolo.table import Table
+from wtforms import Form
+from wtforms import fields as f
+from wtforms.validators import ValidationError
+
+from wtforms_piccolo import instrumentation
+
+"""
+Form fields for Piccolo ORM columns.
+"""
+
+
+def add_error(field: f.Field, message: str) -> None:
+    """
+    Adds an error to a field, also if the field hasn't been validated yet.
+    """
+    if not isinstance(field.errors, list):
+        field.errors = list(field.errors)
+    field.errors.append(message)
+
+
+class IntegerField(f.IntegerField):
+    """
+    An integer field for integer columns. Only plain ASCII integers are
+    accepted (no digit separators or non ASCII digits, which ``int`` also
+    parses), and an empty input is ``None`` instead of an error. The checks
+    run after ``int``, so a valid value costs one extra test of the string.
+    """
+
+    def process_formdata(self, valuelist):
+        if not valuelist:
+            return
+        value = valuelist[0]
+        try:
+            data = int(value)
+        except (ValueError, TypeError) as exc:
+            self.data = None
+            if type(value) is str and (not value or value.isspace()):
+                return
+            raise ValueError(
+                self.gettext("Not a valid integer value.")
+            ) from exc
+        if type(value) is str and ("_" in value or not value.isascii()):
+            self.data = None
+            raise ValueError(self.gettext("Not a valid integer value."))
+        self.data = data
+
+
+class DecimalField(f.DecimalField):
+    """
+    A decimal field for ``Numeric`` / ``Decimal`` columns, keeping the exact
+    decimal value instead of converting it to a float. Non finite values
+    (``NaN``, ``Infinity``) are rejected, and an empty input is ``None``.
+    """
+
+    def process_formdata(self, valuelist):
+        if not valuelist:
+            return
+        value = valuelist[0]
+        try:
+            data = decimal.Decimal(value)
+        except (decimal.InvalidOperation, ValueError, TypeError) as exc:
+            self.data = None
+            if type(value) is str and (not value or value.isspace()):
+                return
+            raise ValueError(
+                self.gettext("Not a valid decimal value.")
+            ) from exc
+        if type(value) is str and data.is_finite():
+            self.data = data
+            return
+        if not data.is_finite():
+            self.data = None
+            raise ValueError(self.gettext("Not a valid decimal value."))
+        if isinstance(value, float):
+            # Use the shortest representation, not the binary expansion.
+            data = decimal.Decimal(repr(value))
+        self.data = data
+
+
+class BooleanField(f.BooleanField):
+    """
+    A checkbox field for ``Boolean`` columns. Besides an unchecked checkbox,
+    the common false strings of imported data are accepted as ``False``.
+    """
+
+    false_values = frozenset((False, "false", "False", "", "0", "off", "no"))
+
+
+class DateTimeTZField(f.DateTimeField):
+    """
+    A date and time field for ``Timestamptz`` columns. Inputs without a UTC
+    offset are in ``timezone`` (UTC by default), and values are displayed
+    converted to it.
+    """
+
+    def __init__(
+        self,
+        label=None,
+        validators=None,
+        format="%Y-%m-%d %H:%M:%S",
+        timezone: datetime.tzinfo = datetime.timezone.utc,
+        **kwargs,
+    ):
+        super().__init__(label, validators, format, **kwargs)
+        self.timezone = timezone
+
+    def _value(self):
+        if self.raw_data:
+            return " ".join(self.raw_data)
+        if self.data is None:
+            return ""
+        data = self.data
+        if data.tzinfo is not None:
+            data = data.astimezone(self.timezone)
+        return data.strftime(self.format[0])
+
+    def process_formdata(self, valuelist):
+        super().process_formdata(valuelist)
+        if self.data is not None and self.data.tzinfo is None:
+            self.data = self.data.replace(tzinfo=self.timezone)
+
+
+def parse_interval(value: str) -> datetime.timedelta:
+    """
+    Parses an interval in the format of ``str(timedelta)``, e.g.
+    ``"2 days, 1:30:00"``, or a number of seconds. Raises ``ValueError`` if
+    the value isn't valid, or out of the range of ``timedelta``.
+    """
+    try:
+        days = 0
+        if "day" in value:
+            head, _, value = value.partition("day")
+            days = int(head)
+            value = value.lstrip("s").lstrip(",").strip()
+        if not value:
+            return datetime.timedelta(days=days)
+        parts = value.split(":")
+        if len(parts) == 1:
+            return datetime.timedelta(days=days, seconds=float(value))
+        if len(parts) > 3:
+            raise ValueError(value)
+        hours, minutes = int(parts[0]), int(parts[1])
+        seconds = float(parts[2]) if len(parts) == 3 else 0.0
+        if not (0 <= minutes < 60 and 0 <= seconds < 60):
+            raise ValueError(value)
+        return datetime.timedelta(
+            days=days, hours=hours, minutes=minutes, seconds=seconds
+        )
+    except OverflowError as exc:
+        raise ValueError(value) from exc
+
+
+class IntervalField(f.StringField):
+    """
+    A text field for ``Interval`` columns, see ``parse_interval`` for the
+    accepted formats. An empty input is ``None``.
+    """
+
+    def _value(self):
+        if self.raw_data:
+            return str(self.raw_data[0])
+        return "" if self.data is None else str(self.data)
+
+    def process_formdata(self, valuelist):
+        if not valuelist:
+            return
+        value = valuelist[0]
+        if isinstance(value, datetime.timedelta):
+            self.data = value
+            return
+        value = str(value).strip()
+        if not value:
+            self.data = None
+            return
+        try:
+            self.data = parse_interval(value)
+        except ValueError as exc:
+            self.data = None
+            raise ValueError(self.gettext("Not a valid interval.")) from exc
+
+
+class JSONField(f.TextAreaField):
+    """
+    A text area for ``JSON`` / ``JSONB`` columns. The input must be valid
+    JSON, and is kept as the JSON string stored by the column. Inputs longer
+    than ``max_size`` characters are rejected without being parsed, so a
+    single large payload can't hold up the process.
+    """
+
+    def __init__(
+        self, label=None, validators=None, max_size: int = 2**20, **kwargs
+    ):
+        """
+        :param max_size:
+            The maximum length of the JSON string.
+        """
+        super().__init__(label, validators, **kwargs)
+        self.max_size = max_size
+
+    def _value(self):
+        if self.data is None:
+            return str(self.raw_data[0]) if self.raw_data else ""
+        if isinstance(self.data, str):
+            return self.data
+        return json.dumps(self.data)
+
+    def process_formdata(self, valuelist):
+        if not valuelist:
+            return
+        value = valuelist[0]
+        if not isinstance(value, str):
+            # Already decoded, e.g. the rows of a JSON lines import.
+            try:
+                value = json.dumps(value)
+            except (TypeError, ValueError) as exc:
+                self.data = None
+                raise ValueError(
+                    self.gettext("Not a valid JSON value.")
+                ) from exc
+        if not value or value.isspace():
+            self.data = None
+            return
+        if len(value) > self.max_size:
+            self.data = None
+            raise ValueError(self.gettext("The JSON value is too large."))
+        try:
+            json.loads(value)
+        except (ValueError, RecursionError) as exc:
+            self.data = None
+            raise ValueError(self.gettext("Not a valid JSON value.")) from exc
+        self.data = value
+
+
+class ListField(f.StringField):
+    """
+    A text field for ``Array`` columns. The items are separated by
+    ``delimiter`` and converted with ``coerce``; the input is split once,
+    without matching the items against a pattern, and blank items are
+    ignored. Items containing the delimiter can't be entered, but repeated
+    inputs with the same name (one item each) and lists are accepted too.
+    """
+
+    def __init__(
+        self,
+        label=None,
+        validators=None,
+        coerce: t.Callable[[t.Any], t.Any] = str,
+        delimiter: str = ",",
+        **kwargs,
+    ):
+        """
+        :param coerce:
+            Converts an item string to the type of the array items.
+        :param delimiter:
+            The item separator.
+        """
+        super().__init__(label, validators, **kwargs)
+        self.coerce = coerce
+        self.delimiter = delimiter
+
+    def _value(self):
+        if self.data is None:
+            if self.raw_data and isinstance(self.raw_data[0], str):
+                return self.raw_data[0]
+            return ""
+        return f"{self.delimiter} ".join(str(i) for i in self.data)
+
+    def process_formdata(self, valuelist):
+        if not valuelist:
+            return
+        if len(valuelist) > 1:
+            items = valuelist
+        elif isinstance(valuelist[0], str):
+            items = valuelist[0].split(self.delimiter)
+        else:
+            items = valuelist[0]
+        coerce = self.coerce
+        data = []
+        try:
+            for item in items:
+                if isinstance(item, str):
+                    item = item.strip()
+                    if not item:
+                        continue
+                    item = coerce(item)
+                data.append(item)
+        except (ValueError, TypeError, ArithmeticError) as exc:
+            self.data = None
+            raise ValueError(self.gettext("Not a valid list.")) from exc
+        self.data = data
+
+
+class SecretField(f.PasswordField):
+    """
+    A password input for ``Secret`` columns. The value is never rendered, and
+    an empty input keeps the current value, so saving an edit form doesn't
+    clear the secret unless a new one is entered.
+    """
+
+    def process_formdata(self, valuelist):
+        if valuelist and valuelist[0] == "" and self.data:
+            return
+        super().process_formdata(valuelist)
+
+
+class BytesField(f.FileField):
+    """
+    A file input for ``Bytea`` columns. Uploaded files (objects with a
+    ``read`` method, or a ``file`` attribute like Starlette's
+    ``UploadFile``), bytes and strings (UTF-8 encoded) are accepted, up to
+    ``max_size`` bytes. Without an upload the current value is kept.
+    """
+
+    def __init__(
+        self, label=None, validators=None, max_size: int = 2**20, **kwargs
+    ):
+        """
+        :param max_size:
+            The maximum size of the value in bytes.
+        """
+        super().__init__(label, validators, **kwargs)
+        self.max_size = max_size
+
+    def process_formdata(self, valuelist):
+        if not valuelist:
+            return
+        value = valuelist[0]
+        file = getattr(value, "file", value)
+        if hasattr(file, "read"):
+            # Read one byte more than allowed to detect larger files.
+            value = file.read(self.max_size + 1)
+        elif isinstance(value, str):
+            value = value.encode()
+        if not isinstance(value, (bytes, bytearray, memoryview)):
+            self.data = None
+            raise ValueError(self.gettext("Not a valid file."))
+        if not value:
+            return
+        if len(value) > self.max_size:
+            self.data = None
+            raise ValueError(self.gettext("The file is too large."))
+        self.data = bytes(value)
+
+
+EnumChoices = namedtuple("EnumChoices", ["choices", "values"])
+
+_enum_choices: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_enum_choices_lock = threading.Lock()
+
+
+def enum_choices(enum_class: t.Type[enum.Enum]) -> EnumChoices:
+    """
+    Returns the ``(value, label)`` choices of a Piccolo ``choices`` enum,
+    and the frozenset of its values. They are built once per enum, and
+    shared by all the fields using it.
+
+    :param enum_class:
+        The enum, whose members are values or ``Choice`` instances. Labels
+        default to the titled member names, as in Piccolo Admin.
+    """
+    with _enum_choices_lock:
+        cached = _enum_choices.get(enum_class)
+    if cached is not None:
+        return cached
+    choices = []
+    for member in enum_class:
+        if isinstance(member.value, Choice):
+            choices.append((member.value.value, member.value.display_name))
+        else:
+            choices.append(
+                (member.value, member.name.replace("_", " ").title())
+            )
+    built = EnumChoices(
+        tuple(choices), frozenset(value for value, _ in choices)
+    )
+    with _enum_choices_lock:
+        return _enum_choices.setdefault(enum_class, built)
+
+
+class EnumSelectField(f.SelectField):
+    """
+    A select field for columns declared with ``choices``. The choices of the
+    enum are shared by all the instances instead of being copied, and a
+    value is validated with a set lookup instead of a scan of the choices.
+    """
+
+    choices: t.Any
+
+    def __init__(
+        self,
+        label=None,
+        validators=None,
+        enum_class: t.Optional[t.Type[enum.Enum]] = None,
+        coerce=str,
+        **kwargs,
+    ):
+        """
+        :param enum_class:
+            The ``choices`` enum of the column.
+        """
+        super().__init__(label, validators, coerce=coerce, **kwargs)
+        self.enum_class = enum_class
+        self._shared = (
+            enum_choices(enum_class) if enum_class is not None else None
+        )
+        if self._shared is not None and self.choices is None:
+            self.choices = self._shared.choices
+
+    def process_data(self, value):
+        # Rows hold the enum members when they are set from Python code.
+        if isinstance(value, enum.Enum):
+            value = value.value
+        if isinstance(value, Choice):
+            value = value.value
+        super().process_data(value)
+
+    def pre_validate(self, form):
+        shared = self._shared
+        if (
+            not self.validate_choice
+            or shared is None
+            or self.choices is not shared.choices
+        ):
+            # Choices replaced on this instance.
+            super().pre_validate(form)
+            return
+        try:
+            valid = self.data in shared.values
+        except TypeError:
+            valid = False
+        if not valid:
+            raise ValidationError(self.gettext("Not a valid choice."))
+
+
+def joined_readable(column: ForeignKey, output_name: str) -> Readable:
+    """
+    Returns the readable of the table referenced by a ``ForeignKey`` column,
+    joined through the column, so the label of the referenced row can be
+    selected together with the row of the column table.
+
+    :param column:
+        The ``ForeignKey`` column.
+    :param output_name:
+        The name of the readable in the query results.
+    """
+    readable = column._foreign_key_meta.resolved_references.get_readable()
+    columns = []
+    for readable_column in readable.columns:
+        # The readable can go through ForeignKey columns of the referenced
+        # table too, e.g. ``cls.task_user.username``.
+        joined = column
+        for link in readable_column._meta.call_chain:
+            joined = getattr(joined, link._meta.name)
+        columns.append(getattr(joined, readable_column._meta.name))
+    return Readable(
+        template=readable.template, columns=columns, output_name=output_name
+    )
+
+
+def foreign_key_readables(
+    table: t.Type[Table],
+    columns: t.Optional[t.Iterable[ForeignKey]] = None,
+) -> t.List[Readable]:
+    """
+    Returns the joined readables of the ``ForeignKey`` columns of a table,
+    named ``<column name>_readable``, e.g. to select the labels of all the
+    referenced rows of a list view in the same query as the rows.
+
+    .. code-block:: python
+
+        await Task.select(*Task.all_columns(), *foreign_key_readables(Task))
+
+    :param table:
+        The table class.
+    :param columns:
+        The ``ForeignKey`` columns, defaults to all of them.
+    """
+    return [
+        joined_readable(column, f"{column._meta.name}_readable")
+        for column in (
+            table._meta.foreign_key_columns if columns is None else columns
+        )
+    ]
+
+
+class ChoicesCache:
+    """
+    A TTL cache of ``ForeignKeyField`` choices, shared across requests. Use
+    it for small lookup tables (statuses, categories...) whose choices are
+    loaded on every form render. Concurrent loads of the same choices share
+    a single query.
+    """
+
+    def __init__(self, ttl: float = 60.0, maxsize: int = 128):
+        """
+        :param ttl:
+            The number of seconds the loaded choices are kept.
+        :param maxsize:
+            The maximum number of choice lists kept in the cache. When the
+            cache is full, the least recently used list is discarded.
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._pending: t.Dict[t.Any, asyncio.Future] = {}
+        # Bumped by ``invalidate``, for the whole cache and per table, so
+        # the loads started before aren't stored.
+        self._cleared = 0
+        self._generations: t.Dict[t.Any, int] = {}
+
+    def _generation(self, key: t.Any) -> t.Tuple[int, int]:
+        return self._cleared, self._generations.get(key[0], 0)
+
+    @staticmethod
+    def make_key(
+        references: t.Type[Table], limit: t.Optional[int]
+    ) -> t.Hashable:
+        """
+        Builds the cache key from the referenced table, its readable and the
+        number of loaded choices.
+        """
+        readable = references.get_readable()
+        return (
+            references,
+            readable.template,
+            tuple(
+                i._meta.get_full_name(with_alias=False)
+                for i in readable.columns
+            ),
+            limit,
+        )
+
+    async def get(
+        self,
+        key: t.Hashable,
+        load: t.Callable[[], t.Awaitable[t.List[t.Tuple[t.Any, str]]]],
+    ) -> t.List[t.Tuple[t.Any, str]]:
+        """
+        Returns the cached choices for ``key``, calling ``load`` if they
+        aren't cached or have expired.
+        """
+        try:
+            expires, choices = self._data[key]
+        except KeyError:
+            pass
+        else:
+            if expires > time.monotonic():
+                self._data.move_to_end(key)
+                return list(choices)
+            del self._data[key]
+
+        # The load runs in a task shared by the concurrent callers, so a
+        # cancelled caller doesn't cancel the load of the others.
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, load))
+            # Retrieve the exception, in case nobody is waiting anymore.
+            task.add_done_callback(
+                lambda task: task.cancelled() or task.exception()
+            )
+            self._pending[key] = task
+        return list(await asyncio.shield(task))
+
+    async def _load(
+        self,
+        key: t.Hashable,
+        load: t.Callable[[], t.Awaitable[t.List[t.Tuple[t.Any, str]]]],
+    ) -> t.Tuple[t.Tuple[t.Any, str], ...]:
+        generation = self._generation(key)
+        task = asyncio.current_task()
+        try:
+            choices = tuple(await load())
+        finally:
+            # Unless ``invalidate`` dropped it, and another load started.
+            if self._pending.get(key) is task:
+                del self._pending[key]
+        # Choices read before an ``invalidate`` may be stale.
+        if self._generation(key) == generation:
+            self._data[key] = (time.monotonic() + self.ttl, choices)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return choices
+
+    def invalidate(self, table: t.Optional[t.Type[Table]] = None) -> None:
+        """
+        Removes cached choices, e.g. after writing to a referenced table.
+        The loads in progress aren't stored, and the next calls of ``get``
+        load the choices again.
+
+        :param table:
+            If set, only the choices of this referenced table are removed,
+            otherwise the whole cache is cleared.
+        """
+        if table is None:
+            self._cleared += 1
+            self._data.clear()
+            self._pending.clear()
+            return
+        self._generations[table] = self._generations.get(table, 0) + 1
+        for key in [k for k in self._data if k[0] is table]:
+            del self._data[key]
+        for key in [k for k in self._pending if k[0] is table]:
+            del self._pending[key]
+
+
+choices_cache = ChoicesCache()
+
+
+class ForeignKeyField(f.SelectField):
+    """
+    A select field for a ``ForeignKey`` column. The choices are read from
+    the referenced table (its primary key and readable) on demand, using
+    ``await field.load_choices()``, so nothing is queried when the field is
+    only validated or when the form is never rendered.
+    """
+
+    def __init__(
+        self,
+        label=None,
+        validators=None,
+        column: t.Optional[ForeignKey] = None,
+        limit: t.Optional[int] = 100,
+        cache: t.Optional[ChoicesCache] = None,
+        readable: t.Optional[Readable] = None,
+        coerce=int,
+        **kwargs,
+    ):
+        """
+        :param column:
+            The ``ForeignKey`` column the field was generated for.
+        :param limit:
+            The maximum number of choices loaded by ``load_choices``. If
+            ``None``, the whole referenced table is loaded.
+        :param cache:
+            If set, ``load_choices`` reads the first page of choices from
+            this ``ChoicesCache`` (e.g. ``choices_cache``) instead of
+            querying the referenced table on every call.
+        :param readable:
+            The readable of the referenced table joined through the column
+            (see ``joined_readable``), selected by ``AsyncTableForm.load``
+            to get the label of the selected row. Defaults to the readable
+            of the referenced table.
+        """
+        super().__init__(label, validators, coerce=coerce, **kwargs)
+        self.column = column
+        self.limit = limit
+        self.cache = cache
+        self._readable = readable
+        #: The ``(primary key, readable)`` of the row selected when the form
+        #: was loaded, e.g. by ``AsyncTableForm.load``.
+        self.selected: t.Optional[t.Tuple[t.Any, str]] = None
+
+    @property
+    def readable(self) -> t.Optional[Readable]:
+        """
+        The readable of the referenced table joined through the column,
+        named ``<column name>_readable``, resolved on first access.
+        """
+        if self._readable is None and self.column is not None:
+            column = t.cast(ForeignKey, self.column)
+            self._readable = joined_readable(
+                column, f"{column._meta.name}_readable"
+            )
+        return self._readable
+
+    @readable.setter
+    def readable(self, value: t.Optional[Readable]) -> None:
+        self._readable = value
+
+    @property
+    def references(self) -> t.Type[Table]:
+        """
+        The table referenced by the ``ForeignKey`` column.
+        """
+        column = t.cast(ForeignKey, self.column)
+        return column._foreign_key_meta.resolved_references
+
+    def choices_query(
+        self,
+        search: t.Optional[str] = None,
+        limit: t.Optional[int] = None,
+        offset: int = 0,
+    ) -> Select:
+        """
+        Returns the query selecting the primary key and readable of the
+        referenced rows.
+
+        :param search:
+            If set, only rows where a text column of the readable contains
+            this term (case insensitive) are selected.
+        :param limit:
+            The maximum number of rows, defaults to the field ``limit``.
+        :param offset:
+            The number of rows to skip, for paginated loading.
+        """
+        references = self.references
+        primary_key = references._meta.primary_key
+        query = references.select(primary_key, references.get_readable())
+        if search:
+            conditions = [
+                (
+                    column.like(f"%{search}%")
+                    if references._meta.db.engine_type == "sqlite"
+                    else column.ilike(f"%{search}%")
+                )
+                for column in references.get_readable().columns
+                if isinstance(column, (Varchar, Text))
+            ]
+            if conditions:
+                where: Combinable = conditions[0]
+                for condition in conditions[1:]:
+                    where = Or(where, condition)
+                query = query.where(where)
+        limit = self.limit if limit is None else limit
+        if limit is not None:
+            query = query.limit(limit)
+        if offset:
+            query = query.offset(offset)
+        return query.order_by(primary_key)
+
+    async def fetch_choices(
+        self,
+        search: t.Optional[str] = None,
+        limit: t.Optional[int] = None,
+        offset: int = 0,
+    ) -> t.List[t.Tuple[t.Any, str]]:
+        """
+        Returns a list of ``(primary key, readable)`` choices, e.g. for an
+        autocomplete endpoint. See ``choices_query`` for the arguments.
+        """
+        primary_key = self.references._meta.primary_key._meta.name
+        rows = await self.choices_query(search, limit, offset).run()
+        return [(row[primary_key], row["readable"]) for row in rows]
+
+    async def load_choices(
+        self,
+        search: t.Optional[str] = None,
+        limit: t.Optional[int] = None,
+        offset: int = 0,
+    ) -> None:
+        """
+        Loads the field choices. The currently selected row is always
+        included, even if it's not in the requested page. See
+        ``choices_query`` for the arguments.
+        """
+        started = instrumentation.start()
+        if self.cache is not None and not search and not offset:
+            limit = self.limit if limit is None else limit
+            choices = await self.cache.get(
+                self.cache.make_key(self.references, limit),
+                lambda: self.fetch_choices(limit=limit),
+            )
+        else:
+            choices = await self.fetch_choices(search, limit, offset)
+        if self.data is not None and self.data not in (i[0] for i in choices):
+            if self.selected is not None and self.selected[0] == self.data:
+                # The label was loaded with the row, no query needed.
+                selected = [self.selected]
+            else:
+                references = self.references
+                primary_key = references._meta.primary_key
+                rows = (
+                    await references.select(
+                        primary_key, references.get_readable()
+                    )
+                    .where(primary_key == self.data)
+                    .run()
+                )
+                selected = [
+                    (row[primary_key._meta.name], row["readable"])
+                    for row in rows
+                ]
+            choices = selected + choices
+        self.choices = choices
+        instrumentation.emit("choices", started, self.references, 1, self.name)
+
+    async def validate_exists(self) -> bool:
+        """
+        Checks with a single query that the selected row exists in the
+        referenced table, adding an error to the field if it doesn't. An
+        empty selection is left to the other validators.
+        """
+        if self.data is None:
+            return True
+        primary_key = self.references._meta.primary_key
+        exists = (
+            await self.references.exists()
+            .where(primary_key == self.data)
+            .run()
+        )
+        if not exists:
+            add_error(self, self.gettext("Not a valid choice."))
+        return exists
+
+    def iter_choices(self):
+        # Without loaded choices, the selected row is rendered alone, with
+        # the label loaded together with the form row.
+        if (
+            self.choices is None
+            and self.selected is not None
+            and self.selected[0] == self.data
+        ):
+            return self._choices_generator([self.selected])
+        return super().iter_choices()
+
+    def pre_validate(self, form):
+        # Without loaded choices there is nothing to compare against, and
+        # the database foreign key constraint still applies.
+        if self.choices is None:
+            return
+        super().pre_validate(form)
+
+
+async def load_foreign_key_choices(
+    form: Form, limit: t.Optional[int] = None
+) -> None:
+    """
+    Concurrently loads the choices of every ``ForeignKeyField`` in a form.
+    Call it only when the form is about to be rendered.
+
+    :param form:
+        The form instance.
+    :param limit:
+        The maximum number of choices per field, defaults to each field's
+        ``limit``.
+    """
+    await asyncio.gather(
+        *(
+            field.load_choices(limit=limit)
+            for field in form
+            if isinstance(field, ForeignKeyField)
+        )
+    )
+
+
+async def validate_foreign_keys(
+    form: Form, fields: t.Optional[t.Iterable[f.Field]] = None
+) -> bool:
+    """
+    Checks that the rows selected in the ``ForeignKeyField`` fields of a form
+    exist. Fields referencing the same table are checked with one query, and
+    the queries for different tables run concurrently. Fields with loaded
+    choices are skipped, as ``validate`` already checks them. Call it after
+    ``form.validate()``, as ``validate`` resets the field errors.
+
+    :param form:
+        The form instance.
+    :param fields:
+        If set, only these fields of the form are checked.
+    :returns:
+        ``True`` if all the selected rows exist.
+    """
+    references_fields: t.Dict[t.Type[Table], t.List[ForeignKeyField]] = {}
+    for field in form if fields is None else fields:
+        if (
+            isinstance(field, ForeignKeyField)
+            and field.data is not None
+            and field.choices is None
+        ):
+            references_fields.setdefault(field.references, []).append(field)
+
+    async def check(
+        references: t.Type[Table], table_fields: t.List[ForeignKeyField]
+    ) -> bool:
+        if len(table_fields) == 1:
+            return await table_fields[0].validate_exists()
+        primary_key = references._meta.primary_key
+        rows = (
+            await references.select(primary_key)
+            .where(primary_key.is_in([i.data for i in table_fields]))
+            .output(as_list=True)
+            .run()
+        )
+        found = set(rows)
+        valid = True
+        for field in table_fields:
+            if field.data not in found:
+                add_error(field, field.gettext("Not a valid choice."))
+                valid = False
+        return valid
+
+    results = await asyncio.gather(
+        *(check(references, i) for references, i in references_fields.items())
+    )
+    return all(results)
@@ -0,0 +1,792 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import hashlib
+import inspect
+import typing as t
+
+from piccolo.columns import JSON, Column, ForeignKey
+from piccolo.table import Table
+from wtforms import Form
+from wtforms import fields as f
+from wtforms.fields.core import UnboundField
+from wtforms.validators import StopValidation, ValidationError
+
+from wtforms_piccolo import instrumentation
+from wtforms_piccolo.fields import (
+    EnumSelectField,
+    ForeignKeyField,
+    add_error,
+    joined_readable,
+    validate_foreign_keys,
+)
+from wtforms_piccolo.validators import Unique, validate_unique
+
+"""
+Async aware form classes for Piccolo ORM tables.
+"""
+
+
+def is_async_validator(validator: t.Callable) -> bool:
+    """
+    Returns ``True`` if the validator is a coroutine function, or an object
+    with an ``async def __call__``.
+    """
+    return inspect.iscoroutinefunction(
+        validator
+    ) or inspect.iscoroutinefunction(getattr(validator, "__call__", None))
+
+
+def _declared_choices(field: f.SelectField, unbound: t.Any) -> t.Any:
+    """
+    Returns the choices of a select field as its constructor sets them from
+    the unbound field of the form class, e.g. to undo the choices set on the
+    field instance.
+
+    :param field:
+        The bound field.
+    :param unbound:
+        The ``UnboundField`` the field was bound from, if known.
+    """
+    choices = None if unbound is None else unbound.kwargs.get("choices")
+    if callable(choices):
+        choices = choices()
+    if choices is not None:
+        return choices if isinstance(choices, dict) else list(choices)
+    if isinstance(field, EnumSelectField) and field._shared is not None:
+        return field._shared.choices
+    return None
+
+
+def rebind_form(
+    form: Form, formdata=None, obj=None, data=None, **kwargs
+) -> None:
+    """
+    Resets the state of a form instance (errors, raw input, the choices of
+    the select fields, the selected ``ForeignKeyField`` rows) and processes
+    new data, reusing the bound fields instead of creating them again.
+
+    :param form:
+        The form instance.
+    :param formdata:
+        The new form data, e.g. the request form.
+    :param obj:
+        The new object to take the field values from.
+    :param data:
+        A dict of field values, as for the form constructor.
+    """
+    unbound_fields = dict(getattr(form, "_unbound_fields", None) or ())
+    form.form_errors = []
+    for field in form:
+        field.errors = ()
+        # Only set by ``process`` with form data, it would keep the input of
+        # the previous request otherwise.
+        field.raw_data = None
+        if isinstance(field, f.SelectField):
+            field.choices = _declared_choices(
+                field, unbound_fields.get(field.short_name)
+            )
+        if isinstance(field, ForeignKeyField):
+            field.selected = None
+    form.process(formdata, obj, data=data, **kwargs)
+
+
+class FormPool:
+    """
+    A pool of reusable form instances of one form class. Each instance is
+    handed out to one task at a time, and rebound to the new data, so the
+    fields aren't created again for every request.
+    """
+
+    def __init__(self, form_class: t.Type[Form], maxsize: int = 32):
+        """
+        :param form_class:
+            The form class, e.g. generated by ``table_form``.
+        :param maxsize:
+            The maximum number of idle instances kept in the pool.
+        """
+        self.form_class = form_class
+        self.maxsize = maxsize
+        self._idle: t.List[Form] = []
+        self._current: contextvars.ContextVar[t.Optional[Form]] = (
+            contextvars.ContextVar(f"form_pool_{id(self)}", default=None)
+        )
+
+    def acquire(self, formdata=None, obj=None, data=None, **kwargs) -> Form:
+        """
+        Returns a form instance bound to the given data, reusing an idle
+        instance if possible. Give it back with ``release``.
+        """
+        try:
+            form = self._idle.pop()
+        except IndexError:
+            return self.form_class(formdata, obj, data=data, **kwargs)
+        rebind = getattr(form, "rebind", None)
+        if rebind is not None:
+            rebind(formdata, obj, data, **kwargs)
+        else:
+            rebind_form(form, formdata, obj, data, **kwargs)
+        return form
+
+    def release(self, form: Form) -> None:
+        """
+        Returns a form instance to the pool.
+        """
+        if len(self._idle) < self.maxsize:
+            self._idle.append(form)
+
+    @contextlib.contextmanager
+    def form(self, formdata=None, obj=None, data=None, **kwargs):
+        """
+        A context manager acquiring a form instance, available with
+        ``current`` in the same task, and releasing it on exit.
+        """
+        form = self.acquire(formdata, obj, data, **kwargs)
+        token = self._current.set(form)
+        try:
+            yield form
+        finally:
+            self._current.reset(token)
+            self.release(form)
+
+    def current(self) -> t.Optional[Form]:
+        """
+        Returns the form instance acquired with ``form`` in the current
+        task, or ``None``.
+        """
+        return self._current.get()
+
+
+class AsyncTableForm(Form):
+    """
+    A form base class supporting async validators, for use as the
+    ``base_class`` of ``table_form``. Async validators (``async def
+    validator(form, field)``, or ``async def validate_<fieldname>`` methods)
+    are skipped by ``validate`` and run by ``await validate_async()``.
+    """
+
+    _table: t.Optional[t.Type[Table]] = None
+
+    def __init__(self, formdata=None, obj=None, *args, **kwargs):
+        started = instrumentation.start()
+        super().__init__(formdata, obj, *args, **kwargs)
+        self._bind_obj(obj)
+        self._async_validators: t.Dict[str, t.List[t.Callable]] = {}
+        self._unique_validators: t.Dict[str, t.List[Unique]] = {}
+        for name, field in self._fields.items():
+            unique_validators = [
+                i for i in field.validators if isinstance(i, Unique)
+            ]
+            if unique_validators:
+                self._unique_validators[name] = unique_validators
+            async_validators = [
+                i for i in field.validators if is_async_validator(i)
+            ]
+            if async_validators:
+                field.validators = [
+                    i for i in field.validators if not is_async_validator(i)
+                ]
+                self._async_validators[name] = async_validators
+        instrumentation.emit("bind", started, self._table, len(self._fields))
+
+    def _bind_obj(self, obj: t.Optional[Table]) -> None:
+        self._obj = obj
+        self._initial = (
+            {}
+            if obj is None
+            else {
+                name: getattr(obj, name)
+                for name in self._fields
+                if hasattr(obj, name)
+            }
+        )
+
+    @property
+    def obj(self) -> t.Optional[Table]:
+        """
+        The row passed to the form as ``obj``, or loaded by ``load``.
+        """
+        return self._obj
+
+    @classmethod
+    def get_load_columns(cls) -> t.List[Column]:
+        """
+        Returns the columns selected by ``load``: the primary key, and the
+        columns of the form fields.
+        """
+        table = t.cast(t.Type[Table], cls._table)
+        primary_key = table._meta.primary_key
+        return [primary_key] + [
+            column
+            for column in table._meta.columns
+            if column is not primary_key
+            and hasattr(getattr(cls, column._meta.name, None), "_formfield")
+        ]
+
+    @classmethod
+    async def load(cls, pk: t.Any, formdata=None, **kwargs):
+        """
+        Loads a row of the form table and returns a form bound to it, as
+        ``cls(formdata, obj=row)``. Only the columns returned by
+        ``get_load_columns`` are selected, together with the readables of
+        the ``ForeignKeyField`` fields (joined in the same query), so
+        loading the choices doesn't query the selected row again. The
+        columns which aren't loaded have their default value in ``obj``.
+
+        :param pk:
+            The primary key of the row.
+        :param formdata:
+            The form data, e.g. the request form.
+        :returns:
+            The form, or ``None`` if the row doesn't exist.
+        """
+        if cls._table is None:
+            raise ValueError("The form has no table.")
+        table = cls._table
+        primary_key = table._meta.primary_key
+        columns = cls.get_load_columns()
+        readables = {}
+        for column in columns:
+            name = column._meta.name
+            unbound = getattr(cls, name, None)
+            if isinstance(column, ForeignKey) and isinstance(
+                unbound, UnboundField
+            ):
+                # The readable of the fields generated by ``table_form``.
+                readables[name] = unbound.kwargs.get(
+                    "readable"
+                ) or joined_readable(column, f"{name}_readable")
+        row = (
+            await table.select(*columns, *readables.values())
+            .where(primary_key == pk)
+            .first()
+            .run()
+        )
+        if row is None:
+            return None
+
+        obj = table(
+            _data={column: row[column._meta.name] for column in columns},
+            _exists_in_db=True,
+        )
+        form = cls(formdata, obj=obj, **kwargs)
+        for name, readable in readables.items():
+            field = form._fields.get(name)
+            value = row[name]
+            if isinstance(field, ForeignKeyField) and value is not None:
+                field.selected = (value, row[readable.output_name])
+        return form
+
+    def rebind(self, formdata=None, obj=None, data=None, **kwargs) -> None:
+        """
+        Resets the form in place and processes new data, as if the form was
+        instantiated again with these arguments. See ``rebind_form``.
+        """
+        started = instrumentation.start()
+        rebind_form(self, formdata, obj, data, **kwargs)
+        self._bind_obj(obj)
+        instrumentation.emit("bind", started, self._table, len(self._fields))
+
+    def validate(self, extra_validators=None):
+        """
+        Runs the sync validators of every field, skipping async ones.
+        """
+        started = instrumentation.start()
+        extra = {}
+        for name in self._fields:
+            validators = list((extra_validators or {}).get(name, ()))
+            inline = getattr(self.__class__, f"validate_{name}", None)
+            if inline is not None:
+                validators.append(inline)
+            extra[name] = [i for i in validators if not is_async_validator(i)]
+        # Inline validators are already included in ``extra``.
+        success = super(Form, self).validate(extra)
+        instrumentation.emit(
+            "validate", started, self._table, len(self._fields)
+        )
+        return success
+
+    def _get_async_validators(
+        self, name: str, extra_validators: t.Optional[dict]
+    ) -> t.List[t.Callable]:
+        validators = list(self._async_validators.get(name, ()))
+        validators += [
+            i
+            for i in (extra_validators or {}).get(name, ())
+            if is_async_validator(i)
+        ]
+        inline = getattr(self.__class__, f"validate_{name}", None)
+        if inline is not None and is_async_validator(inline):
+            validators.append(inline)
+        return validators
+
+    async def _run_async_validators(
+        self, name: str, validators: t.List[t.Callable]
+    ) -> bool:
+        field = self._fields[name]
+        for validator in validators:
+            try:
+                await validator(self, field)
+            except StopValidation as e:
+                if e.args and e.args[0]:
+                    add_error(field, e.args[0])
+                return False
+            except ValidationError as e:
+                add_error(field, e.args[0])
+                return False
+        return True
+
+    def get_async_checks(self, extra_validators=None) -> t.List[t.Awaitable]:
+        """
+        Returns the awaitables running the async validators of the fields
+        without errors. ``validate`` must be called first.
+        """
+        return [
+            self._run_async_validators(name, validators)
+            for name, field in self._fields.items()
+            if not field.errors
+            for validators in [
+                self._get_async_validators(name, extra_validators)
+            ]
+            if validators
+        ]
+
+    def get_foreign_key_fields(self) -> t.List[f.Field]:
+        """
+        Returns the ``ForeignKeyField`` fields without errors.
+        """
+        return [
+            field
+            for field in self
+            if isinstance(field, ForeignKeyField) and not field.errors
+        ]
+
+    def get_unique_checks(self) -> t.List[t.Tuple[f.Field, Unique, t.Any]]:
+        """
+        Returns the ``(field, Unique validator, primary key)`` checks of the
+        fields without errors, for ``validate_unique``.
+        """
+        pk = self.get_pk()
+        return [
+            (self._fields[name], validator, pk)
+            for name, validators in self._unique_validators.items()
+            if not self._fields[name].errors
+            for validator in validators
+        ]
+
+    async def validate_async(self, extra_validators=None) -> bool:
+        """
+        Validates the form. The sync validators run first, then the async
+        validators of the fields without errors. The async validators of
+        different fields, the existence checks of the ``ForeignKeyField``
+        fields and the unique checks run concurrently.
+
+        :param extra_validators:
+            An optional dict mapping field names to lists of extra (sync or
+            async) validators.
+        """
+        success = self.validate(extra_validators)
+        started = instrumentation.start()
+        results = await asyncio.gather(
+            validate_foreign_keys(self, fields=self.get_foreign_key_fields()),
+            validate_unique(self, self.get_unique_checks()),
+            *self.get_async_checks(extra_validators),
+        )
+        instrumentation.emit(
+            "validate_async", started, self._table, len(self._fields)
+        )
+        return success and all(results)
+
+    def get_pk(self) -> t.Any:
+        """
+        Returns the primary key of the row being edited (the ``obj`` passed
+        to the form), or ``None``.
+        """
+        if self._obj is None or self._table is None:
+            return None
+        return getattr(
+            self._obj, self._table._meta.primary_key._meta.name, None
+        )
+
+    def changed_fields(self) -> t.List[str]:
+        """
+        Returns the names of the fields whose data differs from the values
+        of the ``obj`` passed to the form. Without ``obj``, all the fields
+        are considered changed.
+        """
+        return [
+            name
+            for name, field in self._fields.items()
+            if name not in self._initial or field.data != self._initial[name]
+        ]
+
+    async def save(self, instance: t.Optional[Table] = None) -> Table:
+        """
+        Populates a table instance with the form data and saves it. When
+        saving the ``obj`` passed to the form, only the changed columns are
+        updated, and nothing is saved if no column changed.
+
+        :param instance:
+            The table instance to update. If not set, a new row of the form
+            table is created.
+        :returns:
+            The saved instance.
+        """
+        if instance is None:
+            if self._table is None:
+                raise ValueError(
+                    "The form has no table, pass the instance to save."
+                )
+            instance = self._table()
+
+        started = instrumentation.start()
+        if instance is not self._obj or not instance._exists_in_db:
+            self.populate_obj(instance)
+            await instance.save().run()
+        else:
+            column_names = {i._meta.name for i in instance._meta.columns}
+            changed = [i for i in self.changed_fields() if i in column_names]
+            for name in changed:
+                self._fields[name].populate_obj(instance, name)
+            if changed:
+                await instance.save(columns=changed).run()
+        instrumentation.emit(
+            "save", started, type(instance), len(self._fields)
+        )
+        return instance
+
+
+class VersionedTableForm(AsyncTableForm):
+    """
+    An ``AsyncTableForm`` with optimistic concurrency control for edit forms.
+    A version token of the ``obj`` passed to the form is rendered in the
+    hidden ``version_token`` field. ``save`` updates the row with a single
+    conditional ``UPDATE``, which only matches if the row wasn't changed
+    since the token was rendered, and adds a form error otherwise.
+    """
+
+    #: The name of an integer column incremented on every save. If not set,
+    #: the token is a hash of the row, and the update is conditional on all
+    #: the column values, except the ``JSON`` / ``JSONB`` ones (Postgres has
+    #: no equality operator for ``json``), which are only compared with the
+    #: token when the form is validated.
+    version_column: t.Optional[str] = None
+
+    conflict_message = "The row was changed by someone else, please retry."
+
+    version_token = f.HiddenField()
+
+    def __init__(self, formdata=None, obj=None, *args, **kwargs):
+        self._posted = formdata is not None
+        super().__init__(formdata, obj, *args, **kwargs)
+
+    def rebind(self, formdata=None, obj=None, data=None, **kwargs) -> None:
+        self._posted = formdata is not None
+        super().rebind(formdata, obj, data, **kwargs)
+
+    def _bind_obj(self, obj: t.Optional[Table]) -> None:
+        super()._bind_obj(obj)
+        self._loaded_token = None if obj is None else self.get_token(obj)
+        # A submitted form without a token is a conflict, not a new render.
+        if not self._posted and not self.version_token.data:
+            self.version_token.data = self._loaded_token
+
+    def _get_versioned_values(self, obj: Table) -> t.Dict[t.Any, t.Any]:
+        if self.version_column is not None:
+            column = obj._meta.get_column_by_name(self.version_column)
+            return {column: getattr(obj, self.version_column)}
+        return {
+            column: getattr(obj, column._meta.name)
+            for column in obj._meta.columns
+            if not column._meta.primary_key
+        }
+
+    def changed_fields(self) -> t.List[str]:
+        return [i for i in super().changed_fields() if i != "version_token"]
+
+    @classmethod
+    def get_load_columns(cls) -> t.List[Column]:
+        """
+        Returns the columns selected by ``load``. Without a
+        ``version_column``, the token is a hash of the whole row, so all the
+        columns are selected.
+        """
+        table = t.cast(t.Type[Table], cls._table)
+        if cls.version_column is None:
+            return list(table._meta.columns)
+        columns = super().get_load_columns()
+        version_column = table._meta.get_column_by_name(cls.version_column)
+        # Columns compare with ``==`` to build queries, so use identity.
+        if all(i is not version_column for i in columns):
+            columns.append(version_column)
+        return columns
+
+    def get_token(self, obj: Table) -> str:
+        """
+        Returns the version token of a row.
+        """
+        values = self._get_versioned_values(obj)
+        if self.version_column is not None:
+            return str(next(iter(values.values())))
+        return hashlib.sha256(
+            repr(tuple(values.values())).encode()
+        ).hexdigest()
+
+    def validate(self, extra_validators=None):
+        success = super().validate(extra_validators)
+        self.form_errors = [
+            i for i in self.form_errors if i != self.conflict_message
+        ]
+        if (
+            self._loaded_token is not None
+            and self.version_token.data != self._loaded_token
+        ):
+            self.form_errors.append(self.conflict_message)
+            return False
+        return success
+
+    async def save(  # type: ignore[override]
+        self, instance: t.Optional[Table] = None
+    ) -> t.Optional[Table]:
+        """
+        Populates a table instance with the form data and saves it. When
+        saving the ``obj`` passed to the form, the changed columns are
+        updated only if the row still has the loaded version.
+
+        :returns:
+            The saved instance, or ``None`` if the row was changed
+            concurrently, in which case a form error is added.
+        """
+        if (
+            instance is None
+            or instance is not self._obj
+            or not instance._exists_in_db
+        ):
+            return await super().save(instance)
+
+        column_names = {i._meta.name for i in instance._meta.columns}
+        changed = [
+            i
+            for i in self.changed_fields()
+            if i in column_names and i != self.version_column
+        ]
+        if not changed:
+            return instance
+
+        started = instrumentation.start()
+        table = instance.__class__
+        primary_key = table._meta.primary_key
+        values: t.Dict[t.Union[Column, str], t.Any] = {
+            name: self._fields[name].data for name in changed
+        }
+        if self.version_column is not None:
+            values[self.version_column] = (
+                getattr(instance, self.version_column) + 1
+            )
+
+        query = table.update(values).where(
+            primary_key == getattr(instance, primary_key._meta.name)
+        )
+        for column, value in self._get_versioned_values(instance).items():
+            if isinstance(column, JSON):
+                continue
+            query = query.where(
+                column.is_null() if value is None else column == value
+            )
+        saved = await query.returning(primary_key).run()
+        instrumentation.emit("save", started, table, len(self._fields))
+        if not saved:
+            self.form_errors.append(self.conflict_message)
+            return None
+
+        for name, value in values.items():
+            setattr(instance, t.cast(str, name), value)
+        return instance
+
+
+class TableFormSet(Form):
+    """
+    A form for many rows of a table: its ``rows`` field is a ``FieldList``
+    of ``AsyncTableForm`` forms, created by ``table_formset``. The rows are
+    validated together, and saved in one transaction.
+
+    Each row form renders the primary key of its row in a hidden
+    ``row_pk`` field, and the submitted rows are matched to the ``rows``
+    passed to the form set by this primary key, not by their position.
+    Submitted rows without a primary key are new rows, and the form set is
+    invalid if a primary key isn't one of the ``rows``.
+    """
+
+    _table: t.Optional[t.Type[Table]] = None
+
+    #: The name of the hidden field of the row forms holding the primary key.
+    row_key = "row_pk"
+
+    unknown_row_message = "A row was deleted or isn't editable, please retry."
+
+    rows: f.FieldList
+
+    def process(
+        self, formdata=None, obj=None, data=None, extra_filters=None, **kwargs
+    ):
+        formdata = self.meta.wrap_formdata(self, formdata)
+        if data is not None:
+            kwargs = dict(data, **kwargs)
+        self._unknown_rows: t.List[str] = []
+        if formdata:
+            kwargs["rows"] = self._match_rows(formdata, kwargs.get("rows"))
+        super().process(formdata, obj, extra_filters=extra_filters, **kwargs)
+
+        primary_key = t.cast(t.Type[Table], self._table)._meta.primary_key
+        for form in self.row_forms():
+            instance = form._obj
+            if instance is not None and instance._exists_in_db:
+                form[self.row_key].data = getattr(
+                    instance, primary_key._meta.name
+                )
+
+    def _match_rows(
+        self, formdata, rows: t.Optional[t.Iterable[Table]]
+    ) -> t.List[t.Optional[Table]]:
+        """
+        Returns the row instances in the order of the submitted rows, by
+        their ``row_pk``, and ``None`` for the new rows.
+        """
+        primary_key = t.cast(t.Type[Table], self._table)._meta.primary_key
+        by_key = {
+            str(getattr(row, primary_key._meta.name)): row
+            for row in rows or ()
+        }
+        name = self.rows.name
+        indices = sorted(set(self.rows._extract_indices(name, formdata)))
+        if self.rows.max_entries:
+            indices = indices[: self.rows.max_entries]
+        matched: t.List[t.Optional[Table]] = []
+        for index in indices:
+            key = formdata.get(f"{name}-{index}-{self.row_key}")
+            if not key:
+                matched.append(None)
+            else:
+                # Also rejects a row submitted twice.
+                row = by_key.pop(key, None)
+                if row is None:
+                    self._unknown_rows.append(key)
+                matched.append(row)
+        return matched
+
+    def validate(self, extra_validators=None):
+        success = super().validate(extra_validators)
+        if self._unknown_rows:
+            if self.unknown_row_message not in self.form_errors:
+                self.form_errors.append(self.unknown_row_message)
+            return False
+        return success
+
+    def row_forms(self) -> t.List[AsyncTableForm]:
+        """
+        Returns the forms of the rows.
+        """
+        return [entry.form for entry in self.rows]
+
+    async def validate_async(self, extra_validators=None) -> bool:
+        """
+        Validates all the rows. The ``ForeignKeyField`` existence checks and
+        the unique checks of all rows are merged into one query per table,
+        and run concurrently with the async validators of the rows.
+
+        :param extra_validators:
+            An optional dict mapping field names of the rows to lists of
+            extra async validators.
+        """
+        success = self.validate()
+        forms = self.row_forms()
+        started = instrumentation.start()
+        results = await asyncio.gather(
+            validate_foreign_keys(
+                self,
+                fields=[
+                    i for form in forms for i in form.get_foreign_key_fields()
+                ],
+            ),
+            validate_unique(
+                self, [i for form in forms for i in form.get_unique_checks()]
+            ),
+            *[
+                i
+                for form in forms
+                for i in form.get_async_checks(extra_validators)
+            ],
+        )
+        # The errors collected by ``FieldList.validate`` miss the async ones.
+        errors = [form.errors for form in forms]
+        self.rows.errors = errors if any(errors) else []
+        instrumentation.emit(
+            "validate_async",
+            started,
+            self._table,
+            sum(len(form._fields) for form in forms),
+        )
+        return success and all(results)
+
+    async def save(self) -> t.List[Table]:
+        """
+        Saves all the rows in one transaction. New rows are created with a
+        single ``INSERT``, and the changed columns of the existing rows with
+        one ``UPDATE`` per distinct set of changed values.
+
+        :returns:
+            The saved instances, in the order of the rows.
+        """
+        if self._unknown_rows:
+            raise ValueError(
+                f"Unknown rows {self._unknown_rows}, validate the form set "
+                "before saving it."
+            )
+        started = instrumentation.start()
+        table = t.cast(t.Type[Table], self._table)
+        primary_key = table._meta.primary_key
+        column_names = {i._meta.name for i in table._meta.columns}
+
+        instances = []
+        new_instances = []
+        updates: t.Dict[t.Hashable, t.Tuple[dict, list]] = {}
+        for form in self.row_forms():
+            instance = form._obj
+            if instance is None:
+                instance = table()
+            if not instance._exists_in_db:
+                form.populate_obj(instance)
+                new_instances.append(instance)
+            else:
+                values: t.Dict[t.Union[Column, str], t.Any] = {
+                    name: form._fields[name].data
+                    for name in form.changed_fields()
+                    if name in column_names
+                }
+                for name, value in values.items():
+                    setattr(instance, t.cast(str, name), value)
+                if values:
+                    try:
+                        key: t.Hashable = tuple(sorted(values.items()))
+                        hash(key)
+                    except TypeError:
+                        key = id(instance)
+                    updates.setdefault(key, (values, []))[1].append(
+                        getattr(instance, primary_key._meta.name)
+                    )
+            instances.append(instance)
+
+        async with table._meta.db.transaction():
+            if new_instances:
+                await table.insert(*new_instances).run()
+            for values, pks in updates.values():
+                await table.update(values).where(primary_key.is_in(pks)).run()
+        instrumentation.emit(
+            "save",
+            started,
+            table,
+            sum(len(form._fields) for form in self.row_forms()),
+        )
+        return instances
@@ -0,0 +1,358 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import json
+import time
+import typing as t
+from dataclasses import dataclass, field
+
+from piccolo.columns import Or
+from piccolo.columns.combination import Combinable
+from piccolo.table import Table
+from wtforms import Form
+
+from wtforms_piccolo.fields import ForeignKeyField
+from wtforms_piccolo.orm import table_form
+from wtforms_piccolo.validators import Unique
+
+"""
+Bulk import of rows into Piccolo ORM tables, validated by generated forms.
+"""
+
+
+def read_csv(file: t.TextIO, **kwargs) -> t.Iterator[t.Dict[str, str]]:
+    """
+    Yields the rows of a CSV file with a header row, one at a time.
+
+    :param file:
+        An open text file.
+    :param kwargs:
+        Extra keyword arguments passed to ``csv.DictReader``.
+    """
+    return iter(csv.DictReader(file, **kwargs))
+
+
+def read_json_lines(file: t.TextIO) -> t.Iterator[t.Dict[str, t.Any]]:
+    """
+    Yields the objects of a JSON lines file, one at a time. Blank lines are
+    skipped.
+
+    :param file:
+        An open text file.
+    """
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+class RowData:
+    """
+    Wraps a row dictionary as form data. A single instance is rebound to
+    each row, to avoid an allocation per row.
+    """
+
+    __slots__ = ("row",)
+
+    def __init__(self, row: t.Optional[t.Mapping[str, t.Any]] = None):
+        self.row = row or {}
+
+    def __contains__(self, key: str) -> bool:
+        return self.row.get(key) is not None
+
+    def __iter__(self):
+        return iter(self.row)
+
+    def __len__(self) -> int:
+        return len(self.row)
+
+    def getlist(self, key: str) -> list:
+        value = self.row.get(key)
+        if value is None:
+            return []
+        # Numbers from JSON are parsed by the fields like submitted text.
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        return [value]
+
+
+@dataclass
+class ImportResult:
+    """
+    The outcome of a ``TableImporter`` run.
+    """
+
+    rows: int = 0
+    inserted: int = 0
+    failed: int = 0
+    errors: t.List[t.Tuple[int, dict]] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+class TableImporter:
+    """
+    Imports rows into a table, validating each row with a form generated by
+    ``table_form``. A single form instance is reused for all the rows, the
+    valid rows are inserted in batches, and the validation of the next rows
+    overlaps with the insertion of the previous batch.
+
+    The ``ForeignKeyField`` existence checks and the ``Unique`` checks run
+    once per batch before inserting it, with one query per referenced table
+    and one for the unique columns. If inserting a batch still fails, its
+    rows are inserted one by one, so the errors point at the failing rows.
+    """
+
+    def __init__(
+        self,
+        table: t.Type[Table],
+        batch_size: int = 500,
+        queue_size: int = 2,
+        max_errors: int = 1000,
+        form_class: t.Optional[t.Type[Form]] = None,
+        **kwargs,
+    ):
+        """
+        :param table:
+            The table class to import rows into.
+        :param batch_size:
+            The number of rows inserted with one query.
+        :param queue_size:
+            The maximum number of validated batches waiting to be inserted.
+        :param max_errors:
+            The maximum number of row errors kept in the result. Rows over
+            this limit are still counted as failed.
+        :param form_class:
+            The form class used for validation. If not set, it's generated
+            with ``table_form(table, **kwargs)``.
+        """
+        self.table = table
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.max_errors = max_errors
+        self.form_class = form_class or table_form(table, **kwargs)
+
+    async def _produce(
+        self,
+        rows: t.Union[t.Iterable[t.Mapping], t.AsyncIterable[t.Mapping]],
+        queue: asyncio.Queue,
+        result: ImportResult,
+    ) -> None:
+        form = self.form_class()
+        data = RowData()
+        batch: t.List[t.Tuple[int, Table]] = []
+
+        async def rows_iterator():
+            if hasattr(rows, "__aiter__"):
+                async for row in rows:  # type: ignore
+                    yield row
+            else:
+                for row in rows:  # type: ignore
+                    yield row
+
+        async for row in rows_iterator():
+            result.rows += 1
+            data.row = row
+            form.process(formdata=data)
+            if not form.validate():
+                result.failed += 1
+                if len(result.errors) < self.max_errors:
+                    result.errors.append((result.rows, form.errors))
+                continue
+            instance = self.table()
+            form.populate_obj(instance)
+            batch.append((result.rows, instance))
+            if len(batch) >= self.batch_size:
+                await queue.put(batch)
+                batch = []
+                # Let the consumer start inserting the batch.
+                await asyncio.sleep(0)
+        if batch:
+            await queue.put(batch)
+        await queue.put(None)
+
+    def _batch_checks(
+        self,
+    ) -> t.Tuple[t.List[t.Tuple[str, ForeignKeyField]], t.List[tuple]]:
+        """
+        Returns the ``(name, field)`` of the ``ForeignKeyField`` fields, and
+        the ``(name, Unique validator, message)`` of the unique fields,
+        checked per batch.
+        """
+        form = self.form_class()
+        foreign_keys: t.List[t.Tuple[str, ForeignKeyField]] = []
+        unique: t.List[tuple] = []
+        for name, form_field in form._fields.items():
+            if (
+                isinstance(form_field, ForeignKeyField)
+                and form_field.choices is None
+            ):
+                foreign_keys.append((name, form_field))
+            for validator in form_field.validators:
+                if isinstance(validator, Unique):
+                    unique.append(
+                        (
+                            name,
+                            validator,
+                            validator.message
+                            or form_field.gettext("Already exists."),
+                        )
+                    )
+        return foreign_keys, unique
+
+    async def _check_foreign_keys(
+        self,
+        batch: t.List[t.Tuple[int, Table]],
+        foreign_keys: t.List[t.Tuple[str, ForeignKeyField]],
+        errors: t.Dict[int, dict],
+    ) -> None:
+        references_fields: t.Dict[t.Type[Table], t.List[tuple]] = {}
+        for name, form_field in foreign_keys:
+            references_fields.setdefault(form_field.references, []).append(
+                (name, form_field.gettext("Not a valid choice."))
+            )
+
+        async def check(references: t.Type[Table], fields: list) -> None:
+            values = {
+                getattr(instance, name)
+                for _, instance in batch
+                for name, _ in fields
+            }
+            values.discard(None)
+            if not values:
+                return
+            primary_key = references._meta.primary_key
+            found = set(
+                await references.select(primary_key)
+                .where(primary_key.is_in(list(values)))
+                .output(as_list=True)
+                .run()
+            )
+            for row_number, instance in batch:
+                for name, message in fields:
+                    value = getattr(instance, name)
+                    if value is not None and value not in found:
+                        errors.setdefault(row_number, {})[name] = [message]
+
+        await asyncio.gather(*(check(*i) for i in references_fields.items()))
+
+    async def _check_unique(
+        self,
+        batch: t.List[t.Tuple[int, Table]],
+        unique: t.List[tuple],
+        errors: t.Dict[int, dict],
+    ) -> None:
+        values: t.Dict[str, t.Set[t.Any]] = {}
+        for name, validator, _ in unique:
+            values[validator.column._meta.name] = {
+                getattr(instance, name) for _, instance in batch
+            } - {None}
+        conditions = [
+            validator.column.is_in(list(values[validator.column._meta.name]))
+            for _, validator, _ in unique
+            if values[validator.column._meta.name]
+        ]
+        if not conditions:
+            return
+        where: Combinable = conditions[0]
+        for condition in conditions[1:]:
+            where = Or(where, condition)
+        rows = (
+            await self.table.select(*(i.column for _, i, _ in unique))
+            .where(where)
+            .run()
+        )
+        existing = {column: {row[column] for row in rows} for column in values}
+        seen: t.Set[t.Tuple[str, t.Any]] = set()
+        for row_number, instance in batch:
+            for name, validator, message in unique:
+                column = validator.column._meta.name
+                value = getattr(instance, name)
+                if value is None:
+                    continue
+                # Equal values in the same batch are duplicates too.
+                if value in existing[column] or (column, value) in seen:
+                    errors.setdefault(row_number, {})[name] = [message]
+                seen.add((column, value))
+
+    def _add_errors(
+        self, result: ImportResult, errors: t.Iterable[t.Tuple[int, dict]]
+    ) -> None:
+        for row_number, row_errors in errors:
+            result.failed += 1
+            if len(result.errors) < self.max_errors:
+                result.errors.append((row_number, row_errors))
+
+    async def _insert(
+        self, batch: t.List[t.Tuple[int, Table]], result: ImportResult
+    ) -> None:
+        try:
+            await self.table.insert(*(i for _, i in batch)).run()
+        except Exception as exception:
+            if len(batch) == 1:
+                self._add_errors(
+                    result, [(batch[0][0], {None: [str(exception)]})]
+                )
+                return
+            # Find the failing rows.
+            for row in batch:
+                await self._insert([row], result)
+        else:
+            result.inserted += len(batch)
+
+    async def _consume(self, queue: asyncio.Queue, result: ImportResult):
+        foreign_keys, unique = self._batch_checks()
+        while True:
+            batch = await queue.get()
+            if batch is None:
+                return
+            errors: t.Dict[int, dict] = {}
+            checks = []
+            if foreign_keys:
+                checks.append(
+                    self._check_foreign_keys(batch, foreign_keys, errors)
+                )
+            if unique:
+                checks.append(self._check_unique(batch, unique, errors))
+            await asyncio.gather(*checks)
+            if errors:
+                self._add_errors(result, sorted(errors.items()))
+                batch = [i for i in batch if i[0] not in errors]
+            if batch:
+                await self._insert(batch, result)
+
+    async def run(
+        self,
+        rows: t.Union[t.Iterable[t.Mapping], t.AsyncIterable[t.Mapping]],
+    ) -> ImportResult:
+        """
+        Imports the rows.
+
+        :param rows:
+            An iterable or async iterable of row dictionaries, e.g. from
+            ``read_csv`` or ``read_json_lines``.
+        :returns:
+            An ``ImportResult`` with the row counts, the errors as ``(row
+            number, form errors)`` tuples, and the elapsed time.
+        """
+        result = ImportResult()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        start = time.perf_counter()
+        producer = asyncio.ensure_future(self._produce(rows, queue, result))
+        consumer = asyncio.ensure_future(self._consume(queue, result))
+        tasks = {producer, consumer}
+        try:
+            # If one fails, the other would wait forever on the queue.
+            done, _ = await asyncio.wait(
+                tasks, return_when=asyncio.FIRST_EXCEPTION
+            )
+        finally:
+            for task in tasks:
+                task.cancel()
+        for task in done:
+            task.result()
+        result.seconds = time.perf_counter() - start
+        return result
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import bisect
+import contextlib
+import logging
+import threading
+import time
+import typing as t
+from collections import namedtuple
+
+"""
+Opt-in timing instrumentation of the form phases. Nothing is measured until
+a hook is registered with ``add_hook``.
+
+The phases are:
+
+* ``build``: generating a form class with ``table_form``.
+* ``convert``: converting one column to a field, in ``table_fields``.
+* ``bind``: constructing or rebinding an ``AsyncTableForm`` instance.
+* ``choices``: loading the choices of a ``ForeignKeyField``, reported for
+  the referenced table.
+* ``validate``: the sync validation of an ``AsyncTableForm``.
+* ``validate_async``: the async checks of ``validate_async``.
+* ``save``: saving an ``AsyncTableForm`` or a ``TableFormSet``.
+* ``render``: rendering a form with ``render_form``.
+
+Hooks receive a ``PhaseEvent``, with the table name (or ``None``), the
+number of fields, the duration in seconds, and the field name for the per
+field phases (``convert`` and ``choices``).
+"""
+
+PhaseEvent = namedtuple(
+    "PhaseEvent", ["phase", "table", "field_count", "seconds", "field"]
+)
+
+Hook = t.Callable[[PhaseEvent], None]
+
+_hooks: t.List[Hook] = []
+
+
+def add_hook(hook: Hook) -> None:
+    """
+    Registers a callable receiving a ``PhaseEvent`` after every phase.
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook: Hook) -> None:
+    """
+    Unregisters a hook added with ``add_hook``.
+    """
+    _hooks.remove(hook)
+
+
+@contextlib.contextmanager
+def hooked(hook: Hook):
+    """
+    A context manager registering a hook for the duration of a block.
+    """
+    add_hook(hook)
+    try:
+        yield hook
+    finally:
+        remove_hook(hook)
+
+
+def is_enabled() -> bool:
+    """
+    Returns ``True`` if any hook is registered.
+    """
+    return bool(_hooks)
+
+
+def start() -> t.Optional[float]:
+    """
+    Returns the start time of a phase, or ``None`` if no hook is registered,
+    in which case ``emit`` does nothing.
+    """
+    return time.perf_counter() if _hooks else None
+
+
+def emit(
+    phase: str,
+    started: t.Optional[float],
+    table: t.Any = None,
+    field_count: int = 0,
+    field: t.Optional[str] = None,
+) -> None:
+    """
+    Sends a ``PhaseEvent`` to the registered hooks.
+
+    :param phase:
+        The phase name, e.g. ``"validate"``.
+    :param started:
+        The value returned by ``start`` when the phase began.
+    :param table:
+        The table class (or table name) the phase ran for.
+    :param field_count:
+        The number of fields involved.
+    :param field:
+        The field name, for per field phases.
+    """
+    if started is None:
+        return
+    event = PhaseEvent(
+        phase,
+        getattr(getattr(table, "_meta", None), "tablename", table),
+        field_count,
+        time.perf_counter() - started,
+        field,
+    )
+    for hook in tuple(_hooks):
+        hook(event)
+
+
+@contextlib.contextmanager
+def phase(
+    name: str,
+    table: t.Any = None,
+    field_count: int = 0,
+    field: t.Optional[str] = None,
+):
+    """
+    A context manager timing a block as a phase, e.g. to report the time of
+    application code (rendering, choice loading) alongside the built in
+    phases.
+    """
+    started = start()
+    yield
+    emit(name, started, table, field_count, field)
+
+
+class LoggingHook:
+    """
+    A hook logging every phase with the stdlib ``logging`` module.
+    """
+
+    def __init__(
+        self,
+        logger: t.Optional[logging.Logger] = None,
+        level: int = logging.DEBUG,
+    ):
+        """
+        :param logger:
+            The logger, defaults to the ``wtforms_piccolo`` logger.
+        :param level:
+            The level of the log records.
+        """
+        self.logger = logger or logging.getLogger("wtforms_piccolo")
+        self.level = level
+
+    def __call__(self, event: PhaseEvent) -> None:
+        if not self.logger.isEnabledFor(self.level):
+            return
+        self.logger.log(
+            self.level,
+            "%s %s%s: %d fields in %.3f ms",
+            event.phase,
+            event.table,
+            "" if event.field is None else f".{event.field}",
+            event.field_count,
+            event.seconds * 1000,
+        )
+
+
+class Histogram:
+    """
+    Counts observed durations in cumulative buckets, in the style of
+    Prometheus histograms.
+    """
+
+    def __init__(self, buckets: t.Sequence[float]):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> t.Dict[str, t.Any]:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {"count": self.count, "sum": self.sum, "buckets": buckets}
+
+
+class MetricsRegistry:
+    """
+    A hook counting the phases, and recording their durations in
+    histograms, per ``(phase, table)``.
+
+    .. code-block:: python
+
+        metrics = MetricsRegistry()
+        add_hook(metrics)
+        ...
+        metrics.snapshot()
+    """
+
+    #: The default histogram bucket upper bounds, in seconds.
+    default_buckets = (
+        0.0001,
+        0.0005,
+        0.001,
+        0.005,
+        0.01,
+        0.05,
+        0.1,
+        0.5,
+        1.0,
+    )
+
+    def __init__(self, buckets: t.Optional[t.Sequence[float]] = None):
+        """
+        :param buckets:
+            The histogram bucket upper bounds, in seconds.
+        """
+        self.buckets = tuple(buckets or self.default_buckets)
+        self.counters: t.Dict[t.Tuple[str, t.Optional[str]], int] = {}
+        self.histograms: t.Dict[t.Tuple[str, t.Optional[str]], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: PhaseEvent) -> None:
+        key = (event.phase, event.table)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.observe(event.seconds)
+
+    def snapshot(self) -> t.Dict[t.Tuple[str, t.Optional[str]], dict]:
+        """
+        Returns the count and the histogram of every ``(phase, table)``.
+        """
+        with self._lock:
+            return {
+                key: self.histograms[key].snapshot() for key in self.counters
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
@@ -1,14 +1,47 @@
 from __future__ import annotations
 
+import datetime
+import decimal
+import enum
+import threading
+import time
+import types
 import typing as t
+import warnings
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
-from piccolo.columns import Column
+from piccolo.columns import Array, Column, ForeignKey
+from piccolo.columns.defaults.base import Default
+from piccolo.conf.apps import AppConfig
 from piccolo.table import Table
 from wtforms import Form
 from wtforms import fields as f
-from wtforms import validators
+from wtforms import validators, widgets
 from wtforms.validators import DataRequired
 
+from wtforms_piccolo import instrumentation
+from wtforms_piccolo.fields import (
+    BooleanField,
+    BytesField,
+    DateTimeTZField,
+    DecimalField,
+    EnumSelectField,
+    ForeignKeyField,
+    IntegerField,
+    IntervalField,
+    JSONField,
+    ListField,
+    SecretField,
+)
+from wtforms_piccolo.forms import AsyncTableForm, TableFormSet
+from wtforms_piccolo.validators import (
+    UUID,
+    DecimalDigits,
+    NotNull,
+    Unique,
+)
+
 """
 Form generation utilities for Piccolo ORM Table class.
 """
@@ -18,27 +51,33 @@ def convert_IntField(
     table: t.Type[Table],
     prop: t.Type[Column],
     kwargs: t.Optional[dict] = None,
-) -> f.IntegerField:
+) -> IntegerField:
     """Returns a form field for a Integer column."""
-    return f.IntegerField(**kwargs)
+    d: dict = t.cast(dict, kwargs)
+    d["validators"].append(validators.NumberRange(min=-(2**31), max=2**31 - 1))
+    return IntegerField(**kwargs)
 
 
 def convert_SmallIntField(
     table: t.Type[Table],
     prop: t.Type[Column],
     kwargs: t.Optional[dict] = None,
-) -> f.IntegerField:
+) -> IntegerField:
     """Returns a form field for a SmallInt column."""
-    return f.IntegerField(**kwargs)
+    d: dict = t.cast(dict, kwargs)
+    d["validators"].append(validators.NumberRange(min=-(2**15), max=2**15 - 1))
+    return IntegerField(**kwargs)
 
 
 def convert_BigIntField(
     table: t.Type[Table],
     prop: t.Type[Column],
     kwargs: t.Optional[dict] = None,
-) -> f.IntegerField:
+) -> IntegerField:
     """Returns a form field for a BigInt column."""
-    return f.IntegerField(**kwargs)
+    d: dict = t.cast(dict, kwargs)
+    d["validators"].append(validators.NumberRange(min=-(2**63), max=2**63 - 1))
+    return IntegerField(**kwargs)
 
 
 def convert_CharField(
@@ -48,7 +87,9 @@ def convert_CharField(
 ) -> f.StringField:
     """Returns a form field for a Varchar column."""
     d: dict = t.cast(dict, kwargs)
-    d["validators"].append(validators.length(max=255))
+    length = getattr(prop, "length", 255)
+    if length is not None:
+        d["validators"].append(validators.length(max=length))
     return f.StringField(**kwargs)
 
 
@@ -61,6 +102,33 @@ def convert_TextField(
     return f.TextAreaField(**kwargs)
 
 
+def convert_EmailField(
+    table: t.Type[Table],
+    prop: t.Type[Column],
+    kwargs: t.Optional[dict] = None,
+) -> f.EmailField:
+    """Returns a form field for an Email column."""
+    d: dict = t.cast(dict, kwargs)
+    length = getattr(prop, "length", 255)
+    if length is not None:
+        d["validators"].append(validators.length(max=length))
+    d["validators"].append(validators.Email())
+    return f.EmailField(**kwargs)
+
+
+def convert_SecretField(
+    table: t.Type[Table],
+    prop: t.Type[Column],
+    kwargs: t.Optional[dict] = None,
+) -> SecretField:
+    """Returns a form field for a Secret column."""
+    d: dict = t.cast(dict, kwargs)
+    length = getattr(prop, "length", 255)
+    if length is not None:
+        d["validators"].append(validators.length(max=length))
+    return SecretField(**kwargs)
+
+
 def convert_UUIDField(
     table: t.Type[Table],
     prop: t.Type[Column],
@@ -68,7 +136,7 @@ def convert_UUIDField(
 ) -> f.StringField:
     """Returns a form field for a UUID column."""
     d: dict = t.cast(dict, kwargs)
-    d["validators"].append(validators.length(max=255))
+    d["validators"].append(UUID())
     return f.StringField(**kwargs)
 
 
@@ -76,9 +144,9 @@ def convert_BooleanField(
     table: t.Type[Table],
     prop: t.Type[Column],
     kwargs: t.Optional[dict] = None,
-) -> f.BooleanField:
+) -> BooleanField:
     """Returns a form field for a Boolean column."""
-    return f.BooleanField(**kwargs)
+    return BooleanField(**kwargs)
 
 
 def convert_FloatField(
@@ -86,7 +154,7 @@ def convert_FloatField(
     prop: t.Type[Column],
     kwargs: t.Optional[dict] = None,
 ) -> f.FloatField:
-    """Returns a form field for a Numeric column."""
+    """Returns a form field for a Real or DoublePrecision column."""
     return f.FloatField(**kwargs)
 
 
@@ -94,9 +162,21 @@ def convert_DecimalField(
     table: t.Type[Table],
     prop: t.Type[Column],
     kwargs: t.Optional[dict] = None,
-) -> f.FloatField:
-    """Returns a form field for a Decimal column."""
-    return f.FloatField(**kwargs)
+) -> DecimalField:
+    """Returns a form field for a Numeric or Decimal column."""
+    d: dict = t.cast(dict, kwargs)
+    digits = getattr(prop, "digits", None)
+    d.setdefault("places", digits[1] if digits else None)
+    if digits:
+        d["validators"].append(DecimalDigits(*digits))
+        # The HTML5 step of the number input, e.g. "0.01" for 2 places.
+        d.setdefault(
+            "widget",
+            widgets.NumberInput(
+                step=str(decimal.Decimal(1).scaleb(-digits[1]))
+            ),
+        )
+    return DecimalField(**kwargs)
 
 
 def convert_DateTimeField(
@@ -117,13 +197,128 @@ def convert_DateField(
     return f.DateField(**kwargs)
 
 
+def _evaluate_default(kwargs: dict) -> None:
+    """
+    Replaces a Piccolo ``Default`` (e.g. ``TimeNow``) with its value, which
+    is evaluated every time the field is bound.
+    """
+    default = kwargs.get("default")
+    if isinstance(default, Default):
+        kwargs["default"] = default.python
+
+
+def convert_DateTimeTZField(
+    table: t.Type[Table],
+    prop: t.Type[Column],
+    kwargs: t.Optional[dict] = None,
+) -> DateTimeTZField:
+    """Returns a form field for a Timestamptz column."""
+    _evaluate_default(t.cast(dict, kwargs))
+    return DateTimeTZField(**kwargs)
+
+
+def convert_TimeField(
+    table: t.Type[Table],
+    prop: t.Type[Column],
+    kwargs: t.Optional[dict] = None,
+) -> f.TimeField:
+    """Returns a form field for a Time column."""
+    d: dict = t.cast(dict, kwargs)
+    # Keep the seconds, browsers may submit "HH:MM" only.
+    d.setdefault("format", ["%H:%M:%S", "%H:%M"])
+    _evaluate_default(d)
+    return f.TimeField(**kwargs)
+
+
+def convert_IntervalField(
+    table: t.Type[Table],
+    prop: t.Type[Column],
+    kwargs: t.Optional[dict] = None,
+) -> IntervalField:
+    """Returns a form field for an Interval column."""
+    _evaluate_default(t.cast(dict, kwargs))
+    return IntervalField(**kwargs)
+
+
+def convert_JSONField(
+    table: t.Type[Table],
+    prop: t.Type[Column],
+    kwargs: t.Optional[dict] = None,
+) -> JSONField:
+    """Returns a form field for a JSON or JSONB column."""
+    return JSONField(**kwargs)
+
+
+def convert_BytesField(
+    table: t.Type[Table],
+    prop: t.Type[Column],
+    kwargs: t.Optional[dict] = None,
+) -> BytesField:
+    """Returns a form field for a Bytea column."""
+    return BytesField(**kwargs)
+
+
+def _parse_bool(value: str) -> bool:
+    if value in BooleanField.false_values:
+        return False
+    if value in ("true", "True", "1", "on", "yes"):
+        return True
+    raise ValueError(value)
+
+
+# Converts the items of Array columns, by the value type of the base column.
+array_item_coerce: t.Dict[type, t.Callable[[str], t.Any]] = {
+    bool: _parse_bool,
+    datetime.datetime: datetime.datetime.fromisoformat,
+    datetime.date: datetime.date.fromisoformat,
+    datetime.time: datetime.time.fromisoformat,
+}
+
+
+def convert_ListField(
+    table: t.Type[Table],
+    prop: t.Type[Column],
+    kwargs: t.Optional[dict] = None,
+) -> t.Optional[ListField]:
+    """
+    Returns a form field for an Array column. Multidimensional arrays are
+    not converted.
+    """
+    d: dict = t.cast(dict, kwargs)
+    base_column = t.cast(Array, prop).base_column
+    if isinstance(base_column, Array):
+        return None
+    value_type = base_column.value_type
+    d.setdefault("coerce", array_item_coerce.get(value_type, value_type))
+    return ListField(**kwargs)
+
+
+def convert_EnumField(
+    table: t.Type[Table],
+    prop: t.Type[Column],
+    kwargs: t.Optional[dict] = None,
+) -> EnumSelectField:
+    """Returns a form field for a column declared with ``choices``."""
+    d: dict = t.cast(dict, kwargs)
+    d.setdefault("coerce", getattr(prop, "value_type", str))
+    column = t.cast(Column, prop)
+    return EnumSelectField(enum_class=column._meta.choices, **kwargs)
+
+
 def convert_SelectField(
     table: t.Type[Table],
     prop: t.Type[Column],
     kwargs: t.Optional[dict] = None,
-) -> f.SelectField:
+) -> ForeignKeyField:
     """Returns a form field for a FK column."""
-    return f.SelectField(**kwargs, coerce=int)
+    d: dict = t.cast(dict, kwargs)
+    d.setdefault("coerce", getattr(prop, "value_type", int))
+    return ForeignKeyField(column=t.cast(ForeignKey, prop), **kwargs)
+
+
+ColumnPlan = namedtuple(
+    "ColumnPlan", ["name", "column", "converter", "kwargs", "validators"]
+)
 
 
 class TableConverter:
@@ -139,13 +334,25 @@ class TableConverter:
         "Boolean": convert_BooleanField,
         "Serial": convert_IntField,
         "Integer": convert_IntField,
-        "SmallInt": convert_IntField,
-        "BigInt": convert_IntField,
-        "Numeric": convert_FloatField,
-        "Decimal": convert_FloatField,
+        "BigSerial": convert_BigIntField,
+        "SmallInt": convert_SmallIntField,
+        "BigInt": convert_BigIntField,
+        "Numeric": convert_DecimalField,
+        "Decimal": convert_DecimalField,
+        "Real": convert_FloatField,
         "Timestamp": convert_DateTimeField,
+        "Timestamptz": convert_DateTimeTZField,
         "Date": convert_DateField,
+        "Time": convert_TimeField,
+        "Interval": convert_IntervalField,
+        "Email": convert_EmailField,
+        "Secret": convert_SecretField,
+        "JSON": convert_JSONField,
+        "Bytea": convert_BytesField,
+        "Array": convert_ListField,
         "ForeignKey": convert_SelectField,
+        # Columns declared with ``choices``, whatever their type.
+        "Choices": convert_EnumField,
     }
 
     def __init__(self, converters: t.Optional[dict] = None):
@@ -157,6 +364,131 @@ class TableConverter:
             callable must accept the arguments (table, prop, kwargs).
         """
         self.converters = converters or self.default_converters
+        self._column_converters: t.Dict[type, t.Optional[t.Callable]] = {}
+        self._plans: t.Dict[t.Type[Table], t.Tuple[ColumnPlan, ...]] = {}
+        # The plans of each table by column, keyed by id as columns compare
+        # with ``==`` to build queries.
+        self._column_plans: t.Dict[t.Type[Table], t.Dict[int, ColumnPlan]] = {}
+
+    def get_converter(
+        self, column_class: t.Type[Column]
+    ) -> t.Optional[t.Callable]:
+        """
+        Returns the converter callable for a column class, or ``None`` if
+        there isn't one. The column class MRO is walked, so subclasses of
+        known column types use the converter of their closest base class.
+        The result is cached per column class.
+
+        :param column_class:
+            The column class, e.g. ``Varchar``.
+        """
+        try:
+            return self._column_converters[column_class]
+        except KeyError:
+            pass
+        converter = None
+        for klass in column_class.__mro__:
+            converter = self.converters.get(klass.__name__)
+            if converter is not None:
+                break
+        self._column_converters[column_class] = converter
+        return converter
+
+    def compile(self, table: t.Type[Table]) -> t.Tuple[ColumnPlan, ...]:
+        """
+        Returns the conversion plan for a table: a ``ColumnPlan`` with the
+        resolved converter and the static field arguments for every column
+        which can be converted. The plan is cached per table.
+
+        :param table:
+            The table class to compile.
+        """
+        try:
+            return self._plans[table]
+        except KeyError:
+            pass
+        plan = []
+        for prop in table._meta.columns:
+            converter = self.get_converter(type(prop))
+            if prop._meta.choices is not None and not isinstance(
+                prop, (Array, ForeignKey)
+            ):
+                converter = self.converters.get("Choices", converter)
+            if converter is None:
+                continue
+            plan.append(
+                ColumnPlan(
+                    name=prop._meta.name,
+                    column=prop,
+                    converter=converter,
+                    kwargs={
+                        "label": prop._meta.name.title(),
+                        "default": prop._meta.params.get("default"),
+                    },
+                    validators=self.get_validators(prop),
+                )
+            )
+        compiled = tuple(plan)
+        self._plans[table] = compiled
+        return compiled
+
+    def get_validators(self, prop: Column) -> t.Tuple[t.Any, ...]:
+        """
+        Returns the validators derived from the column metadata.
+
+        :param prop:
+            The table property: a ``db.column`` instance.
+        """
+        column_validators: t.List[t.Any] = []
+        if prop._meta.required:
+            column_validators.append(DataRequired())
+        elif prop._meta.null or prop._meta.primary_key:
+            column_validators.append(validators.Optional())
+        else:
+            column_validators.append(NotNull())
+        if prop._meta.unique and not prop._meta.primary_key:
+            column_validators.append(Unique(prop))
+        return tuple(column_validators)
+
+    def invalidate(self, table: t.Optional[t.Type[Table]] = None) -> None:
+        """
+        Discards compiled plans, e.g. after changing ``converters``.
+
+        :param table:
+            If set, only the plan for this table is discarded, otherwise all
+            plans and resolved column converters are discarded.
+        """
+        if table is None:
+            self._plans.clear()
+            self._column_plans.clear()
+            self._column_converters.clear()
+        else:
+            self._plans.pop(table, None)
+            self._column_plans.pop(table, None)
+
+    def build(
+        self,
+        table: t.Type[Table],
+        plan: ColumnPlan,
+        field_args: t.Optional[dict] = None,
+    ):
+        """
+        Returns a form field for a single compiled column.
+
+        :param table:
+            The table class that contains the column.
+        :param plan:
+            The ``ColumnPlan`` of the column, as returned by ``compile``.
+        :param field_args:
+            Optional keyword arguments to construct the field.
+        """
+        kwargs: t.Any = dict(plan.kwargs)
+        validators: list = list(plan.validators)
+        if field_args:
+            kwargs.update(field_args)
+            validators.extend(kwargs.get("validators") or ())
+        kwargs["validators"] = validators
+        return plan.converter(table, plan.column, kwargs)
 
     def convert(
         self,
@@ -174,21 +506,18 @@ class TableConverter:
         :param field_args:
             Optional keyword arguments to construct the field.
         """
-        prop_type_name = type(prop).__name__
-        kwargs: t.Any = {
-            "label": prop._meta.name.title(),
-            "default": prop._meta.params.get("default"),
-            "validators": [],
-        }
-        if field_args:
-            kwargs.update(field_args)
+        try:
+            column_plans = self._column_plans[table]
+        except KeyError:
+            column_plans = {id(i.column): i for i in self.compile(table)}
+            self._column_plans[table] = column_plans
+        plan = column_plans.get(id(prop))
+        if plan is None:
+            return None
+        return self.build(table, plan, field_args)
 
-        if prop._meta.required:
-            kwargs["validators"].append(DataRequired())
 
-        converter = self.converters.get(prop_type_name, None)
-        if converter is not None:
-            return converter(table, prop, kwargs)
+default_converter = TableConverter()
 
 
 def table_fields(
@@ -215,35 +544,194 @@ def table_fields(
         used to construct each field object.
     :param converter:
         A converter to generate the fields based on the table properties. If
-        not set, TableConverter is used.
+        not set, a shared TableConverter is used.
     """
-    converter = converter or TableConverter()
+    table_converter = t.cast(TableConverter, converter or default_converter)
     field_args = field_args or {}
 
-    # Get the field names we want to include or exclude, starting with the
-    # full list of table properties.
-    props = {i._meta.name: i for i in table._meta.columns}
-    field_names = [prop for prop in props.keys()]
+    # Subclasses overriding ``convert`` are still called once per column,
+    # also for the columns without a registered converter.
+    legacy = type(table_converter).convert is not TableConverter.convert
 
-    if only:
-        field_names = [f for f in only if f in field_names]
+    # Get the properties we want to include or exclude, starting with the
+    # full list of table properties, or of the compiled plans.
+    props: t.Dict[str, t.Any]
+    if legacy:
+        props = {i._meta.name: i for i in table._meta.columns}
+    else:
+        plans = {plan.name: plan for plan in table_converter.compile(table)}
+        props = {name: plan.column for name, plan in plans.items()}
 
+    if only:
+        field_names = [f for f in only if f in props]
     elif exclude:
-        field_names = [f for f in field_names if f not in exclude]
+        field_names = [f for f in props if f not in exclude]
+    else:
+        field_names = list(props)
 
     # Create all fields.
     field_dict = {}
     for name in field_names:
-        field = converter.convert(  # type: ignore
-            table,
-            props[name],  # type: ignore
-            field_args.get(name),
-        )
+        started = instrumentation.start()
+        if legacy:
+            field = table_converter.convert(
+                table, props[name], field_args.get(name)
+            )
+        else:
+            field = table_converter.build(
+                table, plans[name], field_args.get(name)
+            )
         if field is not None:
             field_dict[name] = field
+        instrumentation.emit("convert", started, table, 1, name)
     return field_dict
 
 
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+#: The values ``field_args`` can contain for ``table_form`` to be cached:
+#: other objects, like validator instances, are hashed by identity and
+#: would be new on every call.
+_PLAIN_TYPES = (
+    type(None),
+    bool,
+    int,
+    float,
+    str,
+    bytes,
+    decimal.Decimal,
+    datetime.date,
+    datetime.time,
+    datetime.timedelta,
+    enum.Enum,
+    type,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+)
+
+
+def _freeze(value: t.Any, strict: bool = False) -> t.Hashable:
+    """
+    Returns a hashable representation of ``value``, recursively turning
+    dicts into sorted tuples of items and lists / sets into tuples. Raises
+    ``TypeError`` if some nested value can't be hashed, or with ``strict``,
+    isn't a plain value (see ``_PLAIN_TYPES``).
+    """
+    if isinstance(value, dict):
+        return tuple(
+            sorted(
+                ((k, _freeze(v, strict)) for k, v in value.items()),
+                key=lambda item: repr(item[0]),
+            )
+        )
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(i, strict) for i in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(i, strict) for i in value)
+    if strict and not isinstance(value, _PLAIN_TYPES):
+        raise TypeError(f"{type(value).__name__} isn't a plain value.")
+    hash(value)
+    return value
+
+
+class FormClassCache:
+    """
+    A bounded, thread safe LRU cache of form classes generated by
+    ``table_form``.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        """
+        :param maxsize:
+            The maximum number of form classes kept in the cache. When the
+            cache is full, the least recently used form class is discarded.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def make_key(
+        table: t.Type[Table],
+        base_class: type,
+        only: t.Optional[t.Tuple[str, ...]],
+        exclude: t.Optional[t.Tuple[str, ...]],
+        field_args: t.Optional[dict],
+        converter: t.Any,
+    ) -> t.Optional[t.Hashable]:
+        """
+        Builds the cache key for a ``table_form`` call. Returns ``None`` if
+        the arguments can't be hashed, or ``field_args`` contains other
+        objects than plain values (e.g. validator instances, new on every
+        call), in which case the call isn't cached.
+        """
+        try:
+            return (
+                table,
+                base_class,
+                only,
+                exclude,
+                _freeze(field_args or {}, strict=True),
+                _freeze(converter),
+            )
+        except TypeError:
+            return None
+
+    def get(self, key: t.Hashable) -> t.Optional[type]:
+        with self._lock:
+            try:
+                form_class = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return form_class
+
+    def set(self, key: t.Hashable, form_class: type) -> None:
+        with self._lock:
+            self._data[key] = form_class
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, table: t.Optional[t.Type[Table]] = None) -> None:
+        """
+        Removes cached form classes.
+
+        :param table:
+            If set, only the form classes generated for this table are
+            removed, otherwise the whole cache is cleared.
+        """
+        with self._lock:
+            if table is None:
+                self._data.clear()
+                return
+            for key in [k for k in self._data if k[0] is table]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        """
+        Clears the cache and resets the hit / miss counters.
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                self.hits, self.misses, self.maxsize, len(self._data)
+            )
+
+
+form_cache = FormClassCache()
+
+
 def table_form(
     table: t.Type[Table],
     base_class=Form,
@@ -251,6 +739,7 @@ def table_form(
     exclude: t.Optional[t.Iterable[str]] = None,
     field_args: t.Optional[dict] = None,
     converter: t.Optional[t.Union[dict, TableConverter]] = None,
+    cache: bool = True,
 ) -> type:
     """
     Creates and returns a dynamic ``wtforms.Form`` class for a given
@@ -274,12 +763,134 @@ def table_form(
     :param converter:
         A converter to generate the fields based on the table properties. If
         not set, TableConverter is used.
+    :param cache:
+        If ``True``, the generated form class is stored in ``form_cache`` and
+        returned from it on subsequent calls with the same arguments.
     """
+    # Iterated once here, as they may be generators.
+    if only is not None:
+        only = tuple(only)
+    if exclude is not None:
+        exclude = tuple(exclude)
+    key = (
+        form_cache.make_key(
+            table, base_class, only, exclude, field_args, converter
+        )
+        if cache
+        else None
+    )
+    if key is not None:
+        form_class = form_cache.get(key)
+        if form_class is not None:
+            return form_class
+
+    started = instrumentation.start()
+
     # Extract the fields from the table.
     field_dict = table_fields(table, only, exclude, field_args, converter)
 
     # Return a dynamically created form class, extending from base_class and
     # including the created fields as properties.
+    form_class = type(
+        f"{table._meta.tablename.title()}Form",
+        (base_class,),
+        {"_table": table, **field_dict},
+    )
+    if key is not None:
+        form_cache.set(key, form_class)
+    instrumentation.emit("build", started, table, len(field_dict))
+    return form_class
+
+
+def table_formset(
+    table: t.Type[Table],
+    base_class=AsyncTableForm,
+    min_entries: int = 0,
+    max_entries: t.Optional[int] = None,
+    **kwargs,
+) -> type:
+    """
+    Creates and returns a ``TableFormSet`` class, for editing many rows of a
+    table in one form. Its ``rows`` field is a ``FieldList`` of the forms
+    generated by ``table_form``. Pass the existing rows with the ``rows``
+    keyword argument when instantiating it, they are matched to the submitted
+    rows by their primary key.
+
+    :param table:
+        The table class to generate a form set for.
+    :param base_class:
+        Base form class of the rows. Must be an ``AsyncTableForm`` subclass.
+    :param min_entries:
+        The minimum number of rows.
+    :param max_entries:
+        The maximum number of rows accepted from the form data.
+    :param kwargs:
+        Extra keyword arguments passed to ``table_form``, e.g.
+        ``exclude=["id"]``.
+    """
+    row_form = table_form(table, base_class=base_class, **kwargs)
+    # Identifies the row of each submitted row form.
+    row_form = type(
+        row_form.__name__,
+        (row_form,),
+        {TableFormSet.row_key: f.HiddenField()},
+    )
     return type(
-        f"{table._meta.tablename.title()}Form", (base_class,), field_dict
+        f"{table._meta.tablename.title()}FormSet",
+        (TableFormSet,),
+        {
+            "_table": table,
+            "rows": f.FieldList(
+                f.FormField(row_form),
+                min_entries=min_entries,
+                max_entries=max_entries,
+            ),
+        },
     )
+
+
+FormBuildTiming = namedtuple(
+    "FormBuildTiming", ["table", "form_class", "seconds"]
+)
+
+
+def warm_forms(
+    tables: t.Union[AppConfig, t.Sequence[t.Type[Table]]],
+    max_workers: t.Optional[int] = None,
+    **kwargs,
+) -> t.List[FormBuildTiming]:
+    """
+    Generates the form classes for many tables up front (e.g. on application
+    startup), storing them in ``form_cache`` so later ``table_form`` calls
+    with the same arguments don't pay the generation cost.
+
+    :param tables:
+        An ``AppConfig`` (its ``table_classes`` are used) or a sequence of
+        table classes.
+    :param max_workers:
+        If set, the forms are generated in a thread pool with this many
+        workers, otherwise they are generated sequentially.
+    :param kwargs:
+        Extra keyword arguments passed to ``table_form`` for every table,
+        e.g. ``exclude=["id"]``.
+    :returns:
+        A ``FormBuildTiming`` for each table, in the order of ``tables``.
+    """
+    table_classes = list(
+        tables.table_classes if isinstance(tables, AppConfig) else tables
+    )
+    if len(table_classes) > form_cache.maxsize:
+        warnings.warn(
+            f"Warming {len(table_classes)} forms, but form_cache only holds "
+            f"{form_cache.maxsize} form classes."
+        )
+
+    def build(table: t.Type[Table]) -> FormBuildTiming:
+        start = time.perf_counter()
+        form_class = table_form(table, **kwargs)
+        return FormBuildTiming(table, form_class, time.perf_counter() - start)
+
+    if max_workers:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(build, table_classes))
+    return [build(table) for table in table_classes]
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import enum
+import gc
+import hashlib
+import json
+import threading
+import typing as t
+from collections import namedtuple
+
+from piccolo.columns import Column
+from piccolo.table import Table
+
+from wtforms_piccolo.orm import table_form
+from wtforms_piccolo.rendering import FormRenderer, default_renderer
+
+"""
+A registry of form classes built before the server forks its workers.
+"""
+
+RegisteredForm = namedtuple(
+    "RegisteredForm", ["name", "table", "form_class", "fingerprint"]
+)
+
+
+def _describe(value: t.Any) -> t.Any:
+    """
+    Returns a JSON serializable description of a column parameter, which
+    doesn't depend on the process (no ids or memory addresses).
+    """
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    if isinstance(value, Column):
+        return [type(value).__name__, _describe(value._meta.params)]
+    if isinstance(value, enum.Enum):
+        return f"{type(value).__qualname__}.{value.name}"
+    if isinstance(value, type):
+        if issubclass(value, Table):
+            return value._meta.tablename
+        if issubclass(value, enum.Enum):
+            return [
+                value.__qualname__,
+                [[i.name, _describe(i.value)] for i in value],
+            ]
+        return f"{value.__module__}.{value.__qualname__}"
+    if isinstance(value, dict):
+        return [
+            [str(key), _describe(value[key])] for key in sorted(value, key=str)
+        ]
+    if isinstance(value, (list, tuple)):
+        return [_describe(i) for i in value]
+    if callable(value) and hasattr(value, "__qualname__"):
+        return f"{getattr(value, '__module__', '')}.{value.__qualname__}"
+    return repr(value)
+
+
+def table_fingerprint(table: t.Type[Table]) -> str:
+    """
+    Returns a fingerprint of the schema of a table: a hash of its name and
+    the names, types and parameters of its columns. It's the same in every
+    process and run for the same table definition, so it can be stored and
+    compared later.
+
+    :param table:
+        The table class.
+    """
+    description = [
+        table._meta.tablename,
+        [
+            [
+                column._meta.name,
+                type(column).__name__,
+                _describe(column._meta.params),
+            ]
+            for column in table._meta.columns
+        ],
+    ]
+    text = json.dumps(description, separators=(",", ":"))
+    return hashlib.sha256(text.encode()).hexdigest()[:32]
+
+
+class FormRegistry:
+    """
+    Form classes registered on import and built once by ``preload``, e.g. in
+    the master process of gunicorn (``preload_app = True``), before the
+    workers are forked. The workers then share the form classes copy on
+    write, instead of each generating them again.
+
+    ``preload`` also fills what would otherwise be filled lazily in each
+    worker, dirtying the shared memory pages: the field lists WTForms sets
+    on a form class when it's first instantiated, the shared choices of the
+    fields, and the pre-rendered fragments of the renderers. After
+    ``preload``, ``get`` only reads from the registry.
+    """
+
+    def __init__(self):
+        self._specs: t.Dict[str, t.Tuple[t.Type[Table], dict]] = {}
+        self._forms: t.Dict[str, RegisteredForm] = {}
+        self._lock = threading.Lock()
+        self.frozen = False
+
+    @staticmethod
+    def _name(name_or_table: t.Union[str, t.Type[Table]]) -> str:
+        if isinstance(name_or_table, str):
+            return name_or_table
+        return name_or_table._meta.tablename
+
+    def register(
+        self, table: t.Type[Table], name: t.Optional[str] = None, **kwargs
+    ) -> str:
+        """
+        Registers a form class, built by ``preload``. Returns its name.
+
+        :param table:
+            The table class to generate a form for.
+        :param name:
+            The name of the form, defaults to the table name. Register more
+            forms of the same table with different names.
+        :param kwargs:
+            Keyword arguments passed to ``table_form``, e.g.
+            ``exclude=["id"]``.
+        """
+        if self.frozen:
+            raise RuntimeError(
+                "The registry is frozen, register the forms before "
+                "preload()."
+            )
+        name = name or table._meta.tablename
+        self._specs[name] = (table, kwargs)
+        return name
+
+    def _build(
+        self, name: str, renderers: t.Iterable[FormRenderer]
+    ) -> RegisteredForm:
+        table, kwargs = self._specs[name]
+        form_class = table_form(table, **kwargs)
+        # The first instance fills the lazily created class attributes.
+        form = form_class()
+        for renderer in renderers:
+            renderer.get_plans(form)
+        return RegisteredForm(
+            name, table, form_class, table_fingerprint(table)
+        )
+
+    def preload(
+        self,
+        renderers: t.Iterable[FormRenderer] = (default_renderer,),
+        freeze_gc: bool = False,
+    ) -> None:
+        """
+        Builds all the registered form classes, and freezes the registry.
+
+        :param renderers:
+            The renderers used by the application, their fragments are
+            pre-rendered for every form class.
+        :param freeze_gc:
+            If ``True``, ``gc.freeze()`` moves all the objects created so
+            far out of the reach of the garbage collector, which would
+            otherwise write to their memory pages in every worker. Only set
+            it in the master process of a server forking its workers just
+            after, since the frozen objects are never collected.
+        """
+        renderers = tuple(renderers)
+        with self._lock:
+            for name in self._specs:
+                if name not in self._forms:
+                    self._forms[name] = self._build(name, renderers)
+            self.frozen = True
+        if freeze_gc:
+            gc.collect()
+            gc.freeze()
+
+    def get(self, name_or_table: t.Union[str, t.Type[Table]]) -> type:
+        """
+        Returns a registered form class. Before ``preload``, the form class
+        is built on the first call.
+
+        :param name_or_table:
+            The name of the form, or its table class for the forms
+            registered without a name.
+        """
+        name = self._name(name_or_table)
+        entry = self._forms.get(name)
+        if entry is None:
+            if self.frozen or name not in self._specs:
+                raise KeyError(f"No form registered as {name!r}.")
+            with self._lock:
+                entry = self._forms.get(name)
+                if entry is None:
+                    entry = self._build(name, ())
+                    self._forms[name] = entry
+        return entry.form_class
+
+    __getitem__ = get
+
+    def __contains__(self, name_or_table: t.Union[str, t.Type[Table]]):
+        return self._name(name_or_table) in self._specs
+
+    def entries(self) -> t.List[RegisteredForm]:
+        """
+        Returns the built forms, with their table fingerprint.
+        """
+        return list(self._forms.values())
+
+    def manifest(self) -> t.Dict[str, dict]:
+        """
+        Returns a JSON serializable description of the built forms: the
+        table name and fingerprint of each form name. Store it with the
+        deployment, to compare it with ``stale`` later.
+        """
+        return {
+            entry.name: {
+                "table": entry.table._meta.tablename,
+                "fingerprint": entry.fingerprint,
+            }
+            for entry in self._forms.values()
+        }
+
+    def stale(self, manifest: t.Optional[t.Dict[str, dict]] = None) -> list:
+        """
+        Returns the names of the built forms whose table schema changed since
+        they were built.
+
+        :param manifest:
+            If set, the fingerprints are compared with this manifest (e.g.
+            the ``manifest`` of the current release, to detect a master
+            process still running a previous one). Forms missing from it are
+            stale. Otherwise the fingerprints are compared with the current
+            definition of the tables.
+        """
+        stale = []
+        for entry in self._forms.values():
+            fingerprint: t.Optional[str]
+            if manifest is None:
+                fingerprint = table_fingerprint(entry.table)
+            else:
+                fingerprint = manifest.get(entry.name, {}).get("fingerprint")
+            if fingerprint != entry.fingerprint:
+                stale.append(entry.name)
+        return stale
@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import re
+import threading
+import typing as t
+import weakref
+
+from markupsafe import Markup, escape
+from wtforms import Form
+from wtforms import fields as f
+from wtforms import widgets
+
+from wtforms_piccolo import instrumentation
+
+"""
+Rendering of forms from pre-rendered HTML fragments.
+"""
+
+# Rendered in place of the field value while pre-rendering a widget.
+_VALUE = "\x00value\x00"
+
+_WIDGET = "\x00widget\x00"
+_ERRORS = "\x00errors\x00"
+_SLOTS = re.compile(f"({_WIDGET}|{_ERRORS})")
+
+Plan = t.List[t.Union[str, t.Callable[[f.Field, t.List[str]], None]]]
+
+
+class _Placeholder:
+    """
+    Stands in for a bound field while its widget is pre-rendered: the value
+    is a placeholder, and select fields have no choices.
+    """
+
+    def __init__(self, field: f.Field, checked: bool = False):
+        self._field = field
+        self.checked = checked
+
+    def __getattr__(self, name: str) -> t.Any:
+        return getattr(self._field, name)
+
+    def _value(self) -> str:
+        return _VALUE
+
+    def has_groups(self) -> bool:
+        return False
+
+    def iter_choices(self) -> t.Iterator:
+        return iter(())
+
+
+def _split_value(html: str) -> t.Optional[t.Tuple[str, ...]]:
+    """
+    Splits pre-rendered widget HTML around the value placeholder. Returns
+    ``None`` if the placeholder appears more than once.
+    """
+    parts = tuple(html.split(_VALUE))
+    return parts if len(parts) <= 2 else None
+
+
+class FormRenderer:
+    """
+    Renders forms with the HTML fragments which don't depend on the request
+    (labels, wrappers, widget attributes) pre-rendered once per form class.
+    Only the values, the errors and the choices of select fields are
+    rendered per request, and the output is built with a single string
+    join.
+
+    The fragments are cached per form class, so the widgets and the
+    ``render_kw`` of a form class must not be changed per instance.
+    Widgets other than the WTForms inputs, text areas and selects are
+    rendered on every call.
+    """
+
+    def __init__(
+        self,
+        row_template: str = (
+            '<div class="form-group">{label}: {widget}{errors}</div>\n'
+        ),
+        hidden_template: str = "{widget}{errors}\n",
+        error_template: str = '<span class="error">{error}</span>',
+        widget_kw: t.Optional[dict] = None,
+    ):
+        """
+        :param row_template:
+            The HTML of a field, with ``{label}``, ``{widget}`` and
+            ``{errors}`` placeholders.
+        :param hidden_template:
+            The HTML of a hidden field.
+        :param error_template:
+            The HTML of an error, with an ``{error}`` placeholder. Form errors
+            are rendered before the fields.
+        :param widget_kw:
+            Keyword arguments passed to every widget, as in
+            ``field(class_="form-control")``.
+        """
+        self.row_template = row_template
+        self.hidden_template = hidden_template
+        self.error_template = error_template
+        self.widget_kw = widget_kw or {}
+        self._plans: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _render_errors(self, field: f.Field, out: t.List[str]) -> None:
+        for error in field.errors:
+            out.append(self.error_template.format(error=escape(error)))
+
+    def _compile_widget(
+        self, field: f.Field
+    ) -> t.Callable[[f.Field, t.List[str]], None]:
+        widget = field.widget
+        render_kw = dict(self.widget_kw)
+        render_field = field.meta.render_field
+
+        def render(field: f.Field, out: t.List[str]) -> None:
+            out.append(render_field(field, dict(render_kw)))
+
+        if isinstance(widget, widgets.Select):
+            html = render_field(_Placeholder(field), dict(render_kw))
+            head = html[: -len("</select>")]
+
+            def render_select(field: f.Field, out: t.List[str]) -> None:
+                if field.has_groups():
+                    render(field, out)
+                    return
+                out.append(head)
+                for value, label, selected, option_kw in field.iter_choices():
+                    out.append(
+                        widget.render_option(
+                            value, label, selected, **option_kw
+                        )
+                    )
+                out.append("</select>")
+
+            return render_select
+
+        if isinstance(widget, widgets.CheckboxInput):
+            checked = _split_value(
+                render_field(_Placeholder(field, True), dict(render_kw))
+            )
+            unchecked = _split_value(
+                render_field(_Placeholder(field, False), dict(render_kw))
+            )
+            if checked is None or unchecked is None:
+                return render
+
+            def render_checkbox(field: f.Field, out: t.List[str]) -> None:
+                parts = (
+                    checked
+                    if getattr(field, "checked", field.data)
+                    else unchecked
+                )
+                out.append(parts[0])
+                if len(parts) == 2:
+                    out.append(escape(field._value()))
+                    out.append(parts[1])
+
+            return render_checkbox
+
+        if isinstance(widget, (widgets.Input, widgets.TextArea)):
+            parts = _split_value(
+                render_field(_Placeholder(field), dict(render_kw))
+            )
+            if parts is None:
+                return render
+            if len(parts) == 1:
+                static = parts[0]
+                return lambda field, out: out.append(static)
+            head, tail = parts
+
+            def render_value(field: f.Field, out: t.List[str]) -> None:
+                out.append(head)
+                out.append(escape(field._value()))
+                out.append(tail)
+
+            return render_value
+
+        return render
+
+    def compile_field(self, field: f.Field) -> Plan:
+        """
+        Returns the rendering plan of a bound field: the static HTML
+        fragments, and the callables rendering the dynamic parts.
+        """
+        template = (
+            self.hidden_template if field.flags.hidden else self.row_template
+        )
+        html = template.format(
+            label=field.label(), widget=_WIDGET, errors=_ERRORS
+        )
+        plan: Plan = []
+        for part in _SLOTS.split(html):
+            if part == _WIDGET:
+                plan.append(self._compile_widget(field))
+            elif part == _ERRORS:
+                plan.append(self._render_errors)
+            elif part:
+                plan.append(part)
+        return plan
+
+    def get_plans(self, form: Form) -> t.Dict[str, Plan]:
+        """
+        Returns the rendering plans of the fields of a form, compiled on the
+        first call for each form class and prefix.
+        """
+        key = form._prefix
+        with self._lock:
+            plans = self._plans.setdefault(type(form), {}).get(key)
+        if plans is None:
+            plans = {
+                name: self.compile_field(field)
+                for name, field in form._fields.items()
+            }
+            with self._lock:
+                plans = self._plans.setdefault(type(form), {}).setdefault(
+                    key, plans
+                )
+        return plans
+
+    def render(self, form: Form) -> Markup:
+        """
+        Renders the form errors and all the fields of a form.
+        """
+        started = instrumentation.start()
+        plans = self.get_plans(form)
+        out: t.List[str] = []
+        for error in form.form_errors:
+            out.append(self.error_template.format(error=escape(error)))
+        for name, field in form._fields.items():
+            plan = plans.get(name)
+            if plan is None:
+                # A field added to this form instance only.
+                plan = self.compile_field(field)
+            for part in plan:
+                if type(part) is str:
+                    out.append(part)
+                else:
+                    part(field, out)  # type: ignore
+        html = Markup("".join(out))
+        instrumentation.emit(
+            "render",
+            started,
+            getattr(form, "_table", None),
+            len(form._fields),
+        )
+        return html
+
+    def invalidate(self, form_class: t.Optional[t.Type[Form]] = None) -> None:
+        """
+        Discards the pre-rendered fragments of a form class, or of all form
+        classes.
+        """
+        with self._lock:
+            if form_class is None:
+                self._plans.clear()
+            else:
+                self._plans.pop(form_class, None)
+
+
+default_renderer = FormRenderer()
+
+
+def render_form(
+    form: Form, renderer: t.Optional[FormRenderer] = None
+) -> Markup:
+    """
+    Renders a form with pre-rendered HTML fragments. See ``FormRenderer``.
+
+    :param form:
+        The form instance.
+    :param renderer:
+        The renderer, defaults to ``default_renderer``.
+    """
+    return (renderer or default_renderer).render(form)
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import decimal
+import hashlib
+import json
+import threading
+import typing as t
+import weakref
+from collections import namedtuple
+
+from wtforms import Form
+from wtforms import fields as f
+from wtforms import validators
+
+from wtforms_piccolo.fields import ForeignKeyField, ListField
+from wtforms_piccolo.validators import DecimalDigits
+
+"""
+Export of form definitions as JSON schema, for client side validation.
+"""
+
+FormSchema = namedtuple("FormSchema", ["schema", "json", "etag"])
+
+_schemas: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def _json_type(field: f.Field) -> str:
+    if isinstance(field, f.BooleanField):
+        return "boolean"
+    if isinstance(field, f.SelectField):
+        coerce = getattr(field, "coerce", str)
+        if coerce is int:
+            return "integer"
+        return "number" if coerce is float else "string"
+    if isinstance(field, f.IntegerField):
+        return "integer"
+    if isinstance(field, (f.DecimalField, f.FloatField)):
+        return "number"
+    if isinstance(field, ListField):
+        return "array"
+    return "string"
+
+
+def _json_value(value: t.Any) -> t.Any:
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return None
+
+
+def field_schema(
+    field: f.Field, choices_url: t.Optional[str] = None
+) -> t.Dict[str, t.Any]:
+    """
+    Returns the JSON schema of a bound field, derived from its class and
+    validators.
+
+    :param field:
+        The bound field.
+    :param choices_url:
+        The URL template of the ``ForeignKeyField`` choices, with
+        ``{table}`` (the referenced table name) and ``{field}``
+        placeholders, exported as ``x-choices-url``.
+    """
+    json_type = _json_type(field)
+    schema: t.Dict[str, t.Any] = {"type": json_type, "title": field.label.text}
+    if field.description:
+        schema["description"] = field.description
+    # DateField and TimeField are DateTimeField subclasses.
+    if isinstance(field, f.DateField):
+        schema["format"] = "date"
+    elif isinstance(field, f.TimeField):
+        schema["format"] = "time"
+    elif isinstance(field, f.DateTimeField):
+        schema["format"] = "date-time"
+
+    default = field.default() if callable(field.default) else field.default
+    default = _json_value(default)
+    if default is not None:
+        schema["default"] = default
+
+    if isinstance(field, ForeignKeyField):
+        if choices_url is not None:
+            schema["x-choices-url"] = choices_url.format(
+                table=field.references._meta.tablename, field=field.name
+            )
+    elif isinstance(field, f.SelectField) and field.choices is not None:
+        schema["enum"] = [
+            _json_value(value) for value, *_ in field.iter_choices()
+        ]
+
+    for validator in field.validators:
+        if isinstance(validator, validators.Length):
+            if validator.max is not None and validator.max >= 0:
+                schema["maxLength"] = validator.max
+            if validator.min is not None and validator.min > 0:
+                schema["minLength"] = validator.min
+        elif isinstance(validator, validators.NumberRange):
+            if validator.min is not None:
+                schema["minimum"] = _json_value(validator.min)
+            if validator.max is not None:
+                schema["maximum"] = _json_value(validator.max)
+        elif isinstance(validator, DecimalDigits):
+            schema["multipleOf"] = float(
+                decimal.Decimal(1).scaleb(-validator.scale)
+            )
+            schema["exclusiveMaximum"] = 10 ** (
+                validator.precision - validator.scale
+            )
+            schema["exclusiveMinimum"] = -schema["exclusiveMaximum"]
+        elif isinstance(validator, validators.UUID):
+            schema["format"] = "uuid"
+        elif isinstance(validator, validators.Email):
+            schema["format"] = "email"
+        elif isinstance(validator, validators.Regexp):
+            schema["pattern"] = validator.regex.pattern
+        elif isinstance(validator, validators.AnyOf):
+            schema["enum"] = [_json_value(i) for i in validator.values]
+        elif isinstance(validator, validators.Optional):
+            schema["type"] = [json_type, "null"]
+    return schema
+
+
+def _build_schema(form: Form, choices_url: t.Optional[str]) -> FormSchema:
+    properties = {}
+    required = []
+    for field in form:
+        properties[field.name] = field_schema(field, choices_url)
+        if field.flags.required:
+            required.append(field.name)
+    schema = {
+        "title": type(form).__name__,
+        "type": "object",
+        "properties": properties,
+        "required": required,
+    }
+    text = json.dumps(schema, sort_keys=True, separators=(",", ":"))
+    etag = '"' + hashlib.sha256(text.encode()).hexdigest()[:32] + '"'
+    return FormSchema(schema, text, etag)
+
+
+def form_schema(
+    form: t.Union[t.Type[Form], t.Dict[str, t.Any]],
+    choices_url: t.Optional[str] = None,
+) -> FormSchema:
+    """
+    Returns the JSON schema of a form, with the field types, required
+    fields, lengths, ranges, formats and choices, so browsers and single
+    page apps can reject invalid input before submitting it. The schema of
+    a form class is cached per class and ``choices_url``.
+
+    :param form:
+        A form class, e.g. generated by ``table_form``, or a dictionary of
+        fields returned by ``table_fields`` (not cached).
+    :param choices_url:
+        The URL template of the ``ForeignKeyField`` choices, see
+        ``field_schema``.
+    :returns:
+        A ``FormSchema`` with the schema, its serialized JSON, and an ETag
+        for HTTP caching.
+    """
+    if isinstance(form, dict):
+        form_class = type("Form", (Form,), form)
+        return _build_schema(form_class(), choices_url)
+
+    with _lock:
+        schemas = _schemas.setdefault(form, {})
+        try:
+            return schemas[choices_url]
+        except KeyError:
+            pass
+    built = _build_schema(form(), choices_url)
+    with _lock:
+        return schemas.setdefault(choices_url, built)
+
+
+def invalidate_schemas(form_class: t.Optional[t.Type[Form]] = None) -> None:
+    """
+    Removes cached schemas, e.g. after changing a form class.
+
+    :param form_class:
+        If set, only the schemas of this form class are removed, otherwise
+        all the cached schemas.
+    """
+    with _lock:
+        if form_class is None:
+            _schemas.clear()
+        else:
+            _schemas.pop(form_class, None)
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import decimal
+import typing as t
+import uuid
+
+from piccolo.columns import Column, Or
+from piccolo.columns.combination import Combinable
+from piccolo.columns.defaults.base import Default
+from wtforms import Form
+from wtforms import fields as f
+from wtforms import validators
+from wtforms.validators import StopValidation, ValidationError
+
+from wtforms_piccolo.fields import add_error
+
+"""
+Validators for Piccolo ORM columns.
+"""
+
+
+class NotNull:
+    """
+    Stops the validation chain with an error if the field has no value (e.g.
+    an empty integer input), for columns declared with ``null=False``. An
+    input which failed to parse only keeps its parse error.
+    """
+
+    def __init__(self, message: t.Optional[str] = None):
+        self.message = message
+
+    def __call__(self, form: Form, field: f.Field) -> None:
+        if field.data is None:
+            if field.process_errors:
+                # The input isn't empty but invalid, already reported.
+                raise StopValidation()
+            raise StopValidation(
+                self.message or field.gettext("This field can't be empty.")
+            )
+
+
+class UUID(validators.UUID):
+    """
+    Checks that the field value is a valid UUID. Besides strings, the
+    ``uuid.UUID`` values of rows (``obj``) and the column default (e.g.
+    ``UUID4()``, generated when the row is saved) are valid.
+    """
+
+    def __call__(self, form: Form, field: f.Field) -> None:
+        if isinstance(field.data, (uuid.UUID, Default)):
+            return
+        super().__call__(form, field)
+
+
+class DecimalDigits:
+    """
+    Checks that a decimal value fits a ``Numeric(digits=(precision,
+    scale))`` column: at most ``precision - scale`` digits before the
+    decimal point, and at most ``scale`` digits after it.
+    """
+
+    def __init__(
+        self, precision: int, scale: int, message: t.Optional[str] = None
+    ):
+        self.precision = precision
+        self.scale = scale
+        self.message = message
+
+    def __call__(self, form: Form, field: f.Field) -> None:
+        if field.data is None:
+            return
+        try:
+            value = decimal.Decimal(str(field.data)).normalize()
+        except decimal.InvalidOperation:
+            return
+        _, digits, exponent = value.as_tuple()
+        exponent = t.cast(int, exponent)
+        places = max(-exponent, 0)
+        # Zero normalizes to a single "0" digit, before the decimal point.
+        integer_digits = max(len(digits) + exponent, 0) if any(digits) else 0
+        if places > self.scale or integer_digits > self.precision - self.scale:
+            raise ValidationError(
+                self.message
+                or field.gettext(
+                    "At most %(integer)d digits before and %(scale)d digits "
+                    "after the decimal point."
+                )
+                % {
+                    "integer": self.precision - self.scale,
+                    "scale": self.scale,
+                }
+            )
+
+
+class Unique:
+    """
+    Checks that the field value doesn't exist yet in a unique column. The
+    check needs the database, so calling the validator synchronously does
+    nothing: ``AsyncTableForm.validate_async`` runs the unique checks of all
+    its fields with ``validate_unique``, using a single query.
+    """
+
+    def __init__(self, column: Column, message: t.Optional[str] = None):
+        """
+        :param column:
+            The unique column.
+        :param message:
+            The error message, defaults to "Already exists.".
+        """
+        self.column = column
+        self.message = message
+
+    def __call__(self, form: Form, field: f.Field) -> None:
+        pass
+
+
+async def validate_unique(
+    form: Form,
+    checks: t.Iterable[t.Tuple],
+    exclude_pk: t.Any = None,
+) -> bool:
+    """
+    Runs ``Unique`` checks for the fields of one or more forms. The checks
+    are merged into one query per table, selecting the rows where any of the
+    unique columns has one of the submitted values. Equal values submitted
+    for the same column in several checks are reported as duplicates.
+
+    :param form:
+        The form instance.
+    :param checks:
+        An iterable of ``(field, Unique validator)`` tuples, or of ``(field,
+        Unique validator, primary key)`` tuples, where the primary key is the
+        one of the row being edited, which is excluded from the check.
+    :param exclude_pk:
+        The primary key of the row being edited, for checks which don't
+        include it.
+    :returns:
+        ``True`` if none of the values exist.
+    """
+    tables: t.Dict[t.Any, t.List[t.Tuple[f.Field, Unique, t.Any]]] = {}
+    for field, validator, *pk in checks:
+        if field.data is not None:
+            table = validator.column._meta.table
+            tables.setdefault(table, []).append(
+                (field, validator, pk[0] if pk else exclude_pk)
+            )
+
+    valid = True
+    for table, table_checks in tables.items():
+        primary_key = table._meta.primary_key
+        columns: t.Dict[str, Column] = {}
+        values: t.Dict[str, t.List[t.Any]] = {}
+        for field, validator, _ in table_checks:
+            name = validator.column._meta.name
+            columns[name] = validator.column
+            values.setdefault(name, []).append(field.data)
+        conditions = [columns[name].is_in(i) for name, i in values.items()]
+        where: Combinable = conditions[0]
+        for condition in conditions[1:]:
+            where = Or(where, condition)
+        rows = (
+            await table.select(primary_key, *columns.values())
+            .where(where)
+            .run()
+        )
+
+        seen: t.Set[t.Tuple[str, t.Any]] = set()
+        for field, validator, pk in table_checks:
+            name = validator.column._meta.name
+            duplicate = (name, field.data) in seen
+            seen.add((name, field.data))
+            if duplicate or any(
+                row[name] == field.data and row[primary_key._meta.name] != pk
+                for row in rows
+            ):
+                add_error(
+                    field,
+                    validator.message or field.gettext("Already exists."),
+                )
+                valid = False
+    return valid